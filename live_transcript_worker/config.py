@@ -1,23 +1,81 @@
 import logging
 import os
 import sys
+import threading
+from dataclasses import dataclass
 from typing import Any
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader  # type: ignore[assignment]
+
 logger = logging.getLogger(__name__)
 
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Parsed config per path, keyed on the file's (mtime in ns, size) so edits to the
+# yaml are still picked up without re-parsing it on every accessor call.
+_CACHE: dict[str, tuple[int, int, dict[str, Any]]] = {}
+_CACHE_LOCK = threading.Lock()
+_SNAPSHOT_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True, slots=True)
+class ConfigSnapshot:
+    """Read-only view of the config sections served by the Config accessors.
+    Built once per parsed config so the accessors are plain attribute reads."""
+
+    source: dict[str, Any]
+    server: dict[str, Any]
+    transcription: dict[str, Any]
+    streamers: list[dict[str, Any]]
+    streamers_by_key: dict[str, dict[str, Any]]
+    streamer_keys: tuple[str, ...]
+    id_blacklist: list[str]
+
+    @staticmethod
+    def from_dict(config_data: dict[str, Any]) -> "ConfigSnapshot":
+        streamers = config_data.get("streamers", [])
+        streamers_by_key: dict[str, dict[str, Any]] = {}
+        if isinstance(streamers, list):
+            for streamer in streamers:
+                if isinstance(streamer, dict) and "key" in streamer:
+                    # First entry wins, matching the old linear scan.
+                    streamers_by_key.setdefault(streamer["key"], streamer)
+
+        return ConfigSnapshot(
+            source=config_data,
+            server=config_data.get("server", {}),
+            transcription=config_data.get("transcription", {}),
+            streamers=streamers,
+            streamers_by_key=streamers_by_key,
+            streamer_keys=tuple(s["key"] for s in streamers if isinstance(s, dict) and s.get("key")) if isinstance(streamers, list) else (),
+            id_blacklist=config_data.get("id_blacklist", []),
+        )
+
 
 class Config:
     config_filename = "config.yaml"
+    _snapshot: ConfigSnapshot | None = None
 
     @staticmethod
     def get_config() -> dict[str, Any] | None:
-        project_root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        config_path = os.path.join(project_root_dir, "config", Config.config_filename)
+        """Returns the parsed config. The result is cached and only re-parsed
+        when the file's mtime or size changes, so callers must not mutate it."""
+        config_path = os.path.join(_PROJECT_ROOT, "config", Config.config_filename)
         try:
-            with open(config_path, encoding="utf-8") as f:
-                config_data = yaml.safe_load(f)
+            with _CACHE_LOCK:
+                st = os.stat(config_path)
+                cached = _CACHE.get(config_path)
+                if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                    return cached[2]
+
+                with open(config_path, encoding="utf-8") as f:
+                    config_data = yaml.load(f, Loader=_SafeLoader)
+                _CACHE[config_path] = (st.st_mtime_ns, st.st_size, config_data)
                 return config_data
         except FileNotFoundError:
             logger.critical(f"Configuration file '{Config.config_filename}' not found.")
@@ -25,64 +83,62 @@ class Config:
         except yaml.YAMLError as e:
             logger.critical(f"Error parsing YAML file '{Config.config_filename}': {e}")
             sys.exit(1)
-        except ImportError:
-            logger.critical("PyYAML library not found for loading. Please install it: pip install PyYAML")
-            sys.exit(1)
         except Exception as e:
             logger.critical(f"An error occurred while loading the config: {e}")
             sys.exit(1)
 
     @staticmethod
-    def get_server_config() -> dict[str, Any]:
+    def _get_snapshot() -> ConfigSnapshot | None:
+        """Returns the snapshot for the current config, rebuilding it only when
+        get_config hands back a different (re-parsed) dict."""
         config_data = Config.get_config()
         if not config_data:
             logger.error("Error: Cannot search in empty or invalid configuration.")
-            return {}
+            return None
 
-        return config_data.get("server", {})
+        snapshot = Config._snapshot
+        if snapshot is None or snapshot.source is not config_data:
+            with _SNAPSHOT_LOCK:
+                snapshot = Config._snapshot
+                if snapshot is None or snapshot.source is not config_data:
+                    snapshot = ConfigSnapshot.from_dict(config_data)
+                    Config._snapshot = snapshot
+        return snapshot
 
     @staticmethod
-    def get_transcription_config() -> dict[str, Any]:
-        config_data = Config.get_config()
-        if not config_data:
-            logger.error("Error: Cannot search in empty or invalid configuration.")
-            return {}
+    def get_server_config() -> dict[str, Any]:
+        snapshot = Config._get_snapshot()
+        return snapshot.server if snapshot else {}
 
-        return config_data.get("transcription", {})
+    @staticmethod
+    def get_transcription_config() -> dict[str, Any]:
+        snapshot = Config._get_snapshot()
+        return snapshot.transcription if snapshot else {}
 
     @staticmethod
     def get_all_streamers_config() -> list[dict[str, Any]]:
-        config_data = Config.get_config()
-        if not config_data:
-            logger.error("Error: Cannot search in empty or invalid configuration.")
-            return []
+        snapshot = Config._get_snapshot()
+        return snapshot.streamers if snapshot else []
 
-        return config_data.get("streamers", [])
+    @staticmethod
+    def get_streamer_keys() -> tuple[str, ...]:
+        """Keys of all configured streamers, in config order."""
+        snapshot = Config._get_snapshot()
+        return snapshot.streamer_keys if snapshot else ()
 
     @staticmethod
     def get_streamer_config(key: str) -> dict[str, Any]:
-        config_data = Config.get_config()
-        if not config_data:
-            logger.error("Error: Cannot search in empty or invalid configuration.")
+        snapshot = Config._get_snapshot()
+        if not snapshot:
             return {}
 
-        streamer_list = config_data.get("streamers", [])
-
-        if not isinstance(streamer_list, list):
+        if not isinstance(snapshot.streamers, list):
             logger.warning("'streamers' key in config is not a list.")
             return {}
 
-        for streamer in streamer_list:
-            if isinstance(streamer, dict) and "key" in streamer and streamer["key"] == key:
-                return streamer
-
-        return {}
+        return snapshot.streamers_by_key.get(key, {})
 
     @staticmethod
     def get_id_blacklist_config() -> list[str]:
-        config_data = Config.get_config()
-        if not config_data:
-            logger.error("Error: Cannot search in empty or invalid configuration.")
-            return []
-
-        return config_data.get("id_blacklist", [])
+        snapshot = Config._get_snapshot()
+        return snapshot.id_blacklist if snapshot else []
@@ -7,13 +7,15 @@ class Media:
 class ProcessObject:
     """Object type used to hold data ready to be processed"""
 
-    raw: bytes | None
+    __slots__ = ("raw", "audio_start_time", "key", "media_type", "vod_accurate")
+
+    raw: bytes | bytearray | None
     audio_start_time: float
     key: str
     media_type: str
     vod_accurate: bool
 
-    def __init__(self, raw: bytes | None, audio_start_time: float, key: str, media_type: str, vod_accurate: bool):
+    def __init__(self, raw: bytes | bytearray | None, audio_start_time: float, key: str, media_type: str, vod_accurate: bool):
         self.raw = raw
         self.audio_start_time = audio_start_time
         self.key = key
@@ -24,6 +26,8 @@ class ProcessObject:
 class MediaUploadObject:
     """Object type used to hold data ready to be uploaded"""
 
+    __slots__ = ("key", "stream_id", "id", "path")
+
     key: str
     stream_id: str
     id: int
@@ -44,6 +48,18 @@ class MediaUploadObject:
 class StreamInfoObject:
     """Object type used to hold metadata about a stream"""
 
+    __slots__ = (
+        "url",
+        "is_live",
+        "stream_id",
+        "stream_title",
+        "start_time",
+        "key",
+        "media_type",
+        "scheduled_start_time",
+        "confirmed_offline",
+    )
+
     url: str
     is_live: bool
     stream_id: str
@@ -1,3 +1,4 @@
+import contextlib
 import io
 import json
 import logging
@@ -5,7 +6,7 @@ import os
 import re
 import subprocess
 import time
-from typing import Literal
+from typing import BinaryIO, Literal
 
 import av
 
@@ -14,6 +15,55 @@ from live_transcript_worker.custom_types import Media, StreamInfoObject
 
 logger = logging.getLogger(__name__)
 
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_YTDLP_PATH = os.path.join(_PROJECT_ROOT, "bin", "yt-dlp")
+
+# get_duration only needs container metadata, not full stream analysis.
+_DURATION_PROBE_OPTIONS = {"probesize": "32768", "analyzeduration": "0"}
+
+_DATE_RE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b|\b(\d{2}/\d{2}/\d{4})\b|\b(\d{2}:\d{2})\b")
+
+
+class _BufferReader(io.RawIOBase):
+    """Seekable read-only file over a bytearray or memoryview. Unlike io.BytesIO, which copies
+    anything that isn't bytes, it reads straight from the caller's buffer. The buffer stays
+    exported (so a bytearray can't be resized) until the reader is closed."""
+
+    def __init__(self, data: bytearray | memoryview):
+        super().__init__()
+        self._view = memoryview(data).cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = max(0, min(len(b), len(self._view) - self._pos))
+        b[:n] = self._view[self._pos : self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        self._pos = offset
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self):
+        if not self.closed:
+            self._view.release()
+        super().close()
+
 
 class StreamHelper:
     @staticmethod
@@ -38,8 +88,7 @@ class StreamHelper:
         if cookies_cfg.get("enabled", False):
             key = "check_filename" if purpose == "check" else "download_filename"
             filename = cookies_cfg.get(key, "cookies.txt")
-            project_root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            cookies_path = os.path.join(project_root_dir, filename)
+            cookies_path = os.path.join(_PROJECT_ROOT, filename)
             if os.path.isfile(cookies_path):
                 args.extend(["--cookies", cookies_path])
             else:
@@ -51,8 +100,7 @@ class StreamHelper:
         """
         Given a title, this will remove the date and return the result.
         """
-        pattern = r"\b(\d{4}-\d{2}-\d{2})\b|\b(\d{2}/\d{2}/\d{4})\b|\b(\d{2}:\d{2})\b"
-        return re.sub(pattern, "", title).strip()
+        return _DATE_RE.sub("", title).strip()
 
     @staticmethod
     def _dump_stream_stats_debug(key: str, url: str, returncode: int | None, stdout: str, stderr: str) -> None:
@@ -64,8 +112,7 @@ class StreamHelper:
         if not key:
             return
         try:
-            project_root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            key_dir = os.path.join(project_root_dir, "tmp", key)
+            key_dir = os.path.join(_PROJECT_ROOT, "tmp", key)
             os.makedirs(key_dir, exist_ok=True)
             debug_path = os.path.join(key_dir, "stream_stats.log")
 
@@ -125,24 +172,15 @@ class StreamHelper:
 
         Note: yt-dlp -j is high cpu usage for whatever reason. This should only be called very infrequently.
         """
-        project_root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        ytdlp_path = os.path.join(project_root_dir, "bin", "yt-dlp")
-        cmd = [ytdlp_path, "-j", *StreamHelper.ytdlp_auth_args(url, purpose="check"), url]  # -j is alias for --dump-json
-        process = None
+        cmd = [_YTDLP_PATH, "-j", *StreamHelper.ytdlp_auth_args(url, purpose="check"), url]  # -j is alias for --dump-json
         info = StreamInfoObject(url=url)
         stdout = ""
         stderr = ""
         returncode: int | None = None
         try:
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                encoding="utf-8",
-            )
-            stdout, stderr = process.communicate(timeout=30)
-            returncode = process.returncode
+            # run() kills the child itself if the timeout expires.
+            result = subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8", timeout=30, check=False)
+            stdout, stderr, returncode = result.stdout, result.stderr, result.returncode
 
             if returncode != 0:
                 # yt-dlp errors for upcoming or offline YouTube channels with informative
@@ -185,8 +223,6 @@ class StreamHelper:
 
         except subprocess.TimeoutExpired:
             logger.error("[stream_stats] yt-dlp metadata fetch timed out.")
-            if process:
-                process.kill()
         except FileNotFoundError:
             logger.error("[stream_stats] 'yt-dlp' command not found for metadata fetch.")
         except Exception:
@@ -246,9 +282,33 @@ class StreamHelper:
         return 0.0
 
     @staticmethod
-    def get_duration(audio: bytes):
+    def open_buffer(audio: bytes | bytearray | memoryview) -> BinaryIO:
+        """
+        Returns a seekable binary file over the buffer without copying it. Close it (or use it
+        as a context manager) to release a bytearray for resizing.
+        """
+        if isinstance(audio, bytes):
+            return io.BytesIO(audio)  # shares the immutable bytes, no copy
+        return _BufferReader(audio)  # type: ignore[return-value]
+
+    @staticmethod
+    def get_duration(audio: bytes | bytearray | memoryview | BinaryIO) -> float:
+        """
+        Returns the container-reported duration in seconds. Accepts a bytes-like buffer or an
+        already-open seekable binary file object, which is rewound and left open.
+        A bytearray or memoryview is probed in place rather than copied.
+
+        Only container metadata is read, so the probe is capped to a small prefix.
+        """
         try:
-            with io.BytesIO(audio) as buffer, av.open(buffer, mode="r") as container:
+            with contextlib.ExitStack() as stack:
+                # Readers made here are closed on exit (releasing any buffer export); a caller's file object is left open.
+                if isinstance(audio, bytes | bytearray | memoryview):
+                    buffer = stack.enter_context(StreamHelper.open_buffer(audio))
+                else:
+                    buffer = audio
+                    buffer.seek(0)
+                container = stack.enter_context(av.open(buffer, mode="r", options=_DURATION_PROBE_OPTIONS))
                 duration_us = container.duration
                 start_time_us = container.start_time
 
@@ -275,9 +335,4 @@ class StreamHelper:
 
     @staticmethod
     def get_media_type(url: str, key: str) -> str:
-        media_type = Media.NONE
-        key_config = Config.get_streamer_config(key)
-        if key_config:
-            media_type = key_config.get("media_type", Media.NONE)
-
-        return media_type
+        return Config.get_streamer_config(key).get("media_type", Media.NONE)
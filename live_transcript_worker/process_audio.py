@@ -1,14 +1,17 @@
 import gc
 import logging
+import re
 import time
-from io import BytesIO
 from math import floor
-from threading import Event
+from queue import SimpleQueue
+from threading import Event, Thread
+from typing import BinaryIO
 
 from faster_whisper import WhisperModel
 
 from live_transcript_worker.config import Config
 from live_transcript_worker.custom_types import Media, ProcessObject
+from live_transcript_worker.helper import StreamHelper
 from live_transcript_worker.storage import Storage
 
 logger = logging.getLogger(__name__)
@@ -41,9 +44,23 @@ class ProcessAudio:
         "d**n": "damn",
         "****": "fuck",
     }
+    # Case sensitive: every censored word in its capitalized and lowercase form, mapped
+    # straight to its replacement. Lowercase goes last so it wins when both forms are equal ("****").
+    _DECENSOR_VARIANTS = {
+        variant: replacement
+        for word, new_word in _DECENSOR_MAP.items()
+        for variant, replacement in ((word.capitalize(), new_word.capitalize()), (word, new_word))
+    }
+    # Longest alternatives come first so e.g. "f***ing" wins over "f***".
+    _DECENSOR_RE = re.compile("|".join(re.escape(variant) for variant in sorted(_DECENSOR_VARIANTS, key=len, reverse=True)))
 
     def __init__(self, ready_event: Event):
         self.storage = Storage()
+        # Finished lines are handed to a dedicated thread so storage I/O never stalls transcription.
+        # A None entry tells the thread to stop.
+        self.storage_queue: SimpleQueue[tuple[str, dict, bytes | None] | None] = SimpleQueue()
+        self.storage_thread = Thread(target=self.storage_writer, daemon=True)
+        self.storage_thread.start()
         self.whisper_model = None
         # Used to ensure that the model is downloaded before any other action occur
         self.load_model()
@@ -68,6 +85,22 @@ class ProcessAudio:
             gc.collect()
             logger.info("[unload_model] Done.")
 
+    def close(self):
+        """Writes every pending line to storage, then stops the storage thread."""
+        self.storage_queue.put(None)
+        self.storage_thread.join()
+
+    def storage_writer(self):
+        """
+        Internal threaded method that passes finished lines to storage in the order they were transcribed.
+        """
+        while (entry := self.storage_queue.get()) is not None:
+            key, line, raw = entry
+            try:
+                self.storage.add_new_line(key, line, raw)
+            except Exception as e:
+                logger.error(f"[{key}][storage_writer] error adding new line: {e}")
+
     def process_audio(self, item: ProcessObject):
         if item.raw is None:
             # No audio to process
@@ -75,24 +108,19 @@ class ProcessAudio:
         if self.whisper_model is None:
             self.load_model()
         start_time = time.time()
-        with BytesIO(item.raw) as data:
+        with StreamHelper.open_buffer(item.raw) as data:
             transcription_start = time.time()
-            items = self.transcribe(data)
+            items = self.transcribe(data, item.audio_start_time)
             transcription_time = time.time() - transcription_start
 
         if items is None:
             # Audio is too short to be considered as a transcription line.
             return
 
-        segments, duration = items
-        new_segments = []
-        for segment in segments:
-            segment_timestamp, text = segment
-            new_segment = {
-                "timestamp": floor(item.audio_start_time + segment_timestamp),
-                "text": text,
-            }
-            new_segments.append(new_segment)
+        new_segments, duration = items
+        if not new_segments and item.media_type == Media.NONE:
+            # No speech and no media to upload, so the line would carry nothing.
+            return
 
         new_line = {
             "id": -1,  # we let storage take care of setting the line id
@@ -115,15 +143,16 @@ class ProcessAudio:
         logger.info(
             f"[{item.key}][process_audio] time: {(total_processing_time):.3f}, t_time:{transcription_time:.3f}, {duration_time_str}, size: {(size / 1024.0):.3f} KiB"
         )
-        self.storage.add_new_line(item.key, new_line, item.raw)
+        self.storage_queue.put((item.key, new_line, item.raw))
 
-    def transcribe(self, data: BytesIO) -> tuple[list[tuple[float, str]], float] | None:
+    def transcribe(self, data: BinaryIO, audio_start_time: float = 0.0) -> tuple[list[dict], float] | None:
         """Transcribes the audio into segments.
 
         Args:
-            data (BytesIO): a BytesIO object of the raw binary audio data.
+            data (BinaryIO): a seekable file object over the raw binary audio data.
+            audio_start_time (float): offset added to each segment's start to get its absolute timestamp.
 
-        Returns: None if the audio is too short, or a list of segment tuples (start_time, text)
+        Returns: None if the audio is too short, or a list of segment dicts {"timestamp", "text"}
         """
         if self.whisper_model is None:
             self.load_model()
@@ -141,10 +170,13 @@ class ProcessAudio:
                 # duration is small usually when we are using FixedBitrateWorker and an ad starts playing. So we skip it.
                 return None
 
-            new_segments: list[tuple[float, str]] = []
-            for segment in segments:
-                text = self.decensor(segment.text.strip())
-                new_segments.append((segment.start, text))
+            new_segments = [
+                {
+                    "timestamp": floor(audio_start_time + segment.start),
+                    "text": self.decensor(segment.text.strip()),
+                }
+                for segment in segments
+            ]
 
             return new_segments, info.duration
 
@@ -156,9 +188,7 @@ class ProcessAudio:
             return [], -1.0
 
     def decensor(self, text: str) -> str:
-        # Case sensitive. We replace for both lowercase and uppercase versions.
-        for old_word, new_word in self._DECENSOR_MAP.items():
-            text = text.replace(old_word.lower(), new_word.lower())
-            text = text.replace(old_word.capitalize(), new_word.capitalize())
+        return self._DECENSOR_RE.sub(self._decensor_match, text)
 
-        return text
+    def _decensor_match(self, match: re.Match[str]) -> str:
+        return self._DECENSOR_VARIANTS[match.group(0)]
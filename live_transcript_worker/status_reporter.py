@@ -1,5 +1,6 @@
 import logging
 import os
+import random
 import threading
 
 import httpx
@@ -10,6 +11,9 @@ logger = logging.getLogger(__name__)
 
 
 class StatusReporter(threading.Thread):
+    # Attempts per tick before giving up until the next one.
+    MAX_ATTEMPTS = 3
+
     def __init__(self, stop_event: threading.Event):
         super().__init__(daemon=True)
         self.stop_event = stop_event
@@ -18,9 +22,18 @@ class StatusReporter(threading.Thread):
         self.base_url = self.server_config.get("url", "http://localhost:8080")
         api_key = self.server_config.get("apiKey", "")
         self.headers = {"X-API-Key": api_key.strip()}
+        # Fixed for the life of the process
+        self.version = os.getenv("APP_VERSION", "local")
+        self.build_time = os.getenv("BUILD_DATE", "unknown")
 
-        # Initialize persistent client
-        self.client = httpx.Client(base_url=self.base_url, headers=self.headers, timeout=10.0)
+        # Initialize persistent client. Only one endpoint is ever hit, so a single
+        # kept-alive connection is enough.
+        self.client = httpx.Client(
+            base_url=self.base_url,
+            headers=self.headers,
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=1, max_keepalive_connections=1),
+        )
 
     def run(self):
         if self.enable_request is False:
@@ -40,17 +53,19 @@ class StatusReporter(threading.Thread):
         logger.info("[StatusReporter] Stopping status reporter thread")
 
     def send_status(self):
-        version = os.getenv("APP_VERSION", "local")
-        build_time = os.getenv("BUILD_DATE", "unknown")
-
-        streamers = Config.get_all_streamers_config()
-        keys: list[str] = [s.get("key") for s in streamers if s.get("key")]  # type: ignore
+        payload = {"version": self.version, "build_time": self.build_time, "keys": list(Config.get_streamer_keys())}
 
-        payload = {"version": version, "build_time": build_time, "keys": keys}
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            try:
+                response = self.client.post("/status", json=payload)
+                if response.status_code != 200:
+                    logger.warning(f"[StatusReporter] Server returned {response.status_code}: {response.text}")
+                return
+            except httpx.RequestError as e:
+                logger.error(f"[StatusReporter] Network error sending status (attempt {attempt}/{self.MAX_ATTEMPTS}): {e}")
 
-        try:
-            response = self.client.post("/status", json=payload)
-            if response.status_code != 200:
-                logger.warning(f"[StatusReporter] Server returned {response.status_code}: {response.text}")
-        except httpx.RequestError as e:
-            logger.error(f"[StatusReporter] Network error sending status: {e}")
+            if attempt < self.MAX_ATTEMPTS:
+                # Exponential backoff with jitter, cut short on shutdown.
+                delay = min(60, 2**attempt) + random.uniform(0, 1)
+                if self.stop_event.wait(delay):
+                    return
@@ -1,14 +1,17 @@
 import contextlib
+import json
 import logging
 import marshal
 import os
 import queue
+import random
 import re
 import shutil
 import threading
 import time
-from datetime import datetime
-from urllib.parse import quote
+from email.utils import parsedate_to_datetime
+from itertools import zip_longest
+from typing import BinaryIO, NamedTuple, TextIO
 
 import requests
 from requests.adapters import HTTPAdapter
@@ -19,14 +22,43 @@ from live_transcript_worker.custom_types import MediaUploadObject, StreamInfoObj
 
 logger = logging.getLogger(__name__)
 
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Queued media files are named media_stream_id=<stream id> line_id=<line id>.bin
+_MEDIA_FILE_RE = re.compile(r"media_stream_id=(.*)\sline_id=(.*)\.bin")
+
+# Compact separators keep each transcript.jsonl record to a single short line.
+_JSON_SEPARATORS = (",", ":")
+
+
+def _fmt_hms(total_seconds: int) -> str:
+    """Formats an elapsed number of seconds as HH:MM:SS."""
+    minutes, seconds = divmod(total_seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+class _KeyPaths(NamedTuple):
+    """On-disk locations of a key's state, all under tmp/{key}/"""
+
+    marshal: str
+    header: str
+    log: str
+    transcript: str
+    queue: str
+
 
 class SingletonMeta(type):
     _instances = {}
+    _lock = threading.Lock()
 
     def __call__(cls, *args, **kwargs):
+        # Double-checked so only first construction pays for the lock, and
+        # concurrent first calls can't build two instances.
         if cls not in cls._instances:
-            instance = super().__call__(*args, **kwargs)
-            cls._instances[cls] = instance
+            with cls._lock:
+                if cls not in cls._instances:
+                    cls._instances[cls] = super().__call__(*args, **kwargs)
         return cls._instances[cls]
 
 
@@ -69,10 +101,37 @@ class Storage(metaclass=SingletonMeta):
 
         self.__base_url_session = self.__base_url
 
+        # Append handles for each key's transcript.jsonl, kept open between lines.
+        self.__log_files: dict[str, BinaryIO] = {}
+        # Guards the log handles: the storage writer thread appends while activate rewrites the log.
+        # Reentrant since _dict_to_file and _read_log close the handle while holding it.
+        self.__log_lock = threading.RLock()
+        # Local-mode transcript.text handles, kept open (line buffered) until the stream is deactivated.
+        self.__transcript_files: dict[str, TextIO] = {}
+        # Guards the transcript handles: the storage writer thread writes them while deactivate closes them.
+        self.__transcript_lock = threading.Lock()
+        # Parsed startTime per key for local-mode timestamps. Reset whenever activate changes it.
+        self.__start_seconds: dict[str, int] = {}
+        # Loaded state per key. Callers mutate it in place, then persist the change.
+        self._state: dict[str, dict] = {}
+        self.__paths: dict[str, _KeyPaths] = {}
+
         self.__upload_queue: queue.Queue[MediaUploadObject] = queue.Queue()
+        # _enqueue_media calls still writing their file, so wait_for_uploads knows when the queue is complete.
+        self.__pending_enqueues = 0
+        self.__enqueues_done = threading.Condition()
         self._process_old_queue_files()
         threading.Thread(target=self._media_upload_worker, daemon=True).start()
 
+    def close(self):
+        """Closes the HTTP sessions and their pooled keep-alive connections. Called once on shutdown."""
+        self.session.close()
+        self.longpoll_session.close()
+        for key in list(self.__log_files):
+            self._close_log(key)
+        for key in list(self.__transcript_files):
+            self._close_transcript_file(key)
+
     def create_paths(self, key: str):
         marshal_path = os.path.dirname(self._get_marshal_file(key))
         transcript_path = os.path.dirname(self._get_transcript_file(key))
@@ -95,8 +154,9 @@ class Storage(metaclass=SingletonMeta):
             info (StreamInfoObject): stream info we want to activate.
         """
         start_time = time.time()
-        active_id = self._get_active_id(info.key)
-        if info.stream_id != active_id:
+        self.__start_seconds.pop(info.key, None)
+        data = self._file_to_dict(info.key)
+        if info.stream_id != data["streamId"]:
             logger.info(f"[{info.key}][activate] New stream id. Resetting data")
             self._dict_to_file(
                 info.key,
@@ -111,25 +171,20 @@ class Storage(metaclass=SingletonMeta):
             )
             if not self.__enable_request:
                 # request disabled, so we reset the local file
-                with open(self._get_transcript_file(info.key), "w") as f:
-                    f.write(f"Activating stream {info.stream_title} [{info.stream_id}] started at [{info.start_time}]\n")
+                self._write_transcript(
+                    info.key, f"Activating stream {info.stream_title} [{info.stream_id}] started at [{info.start_time}]\n", reset=True
+                )
 
             # Clear upload queue and delete queue files
-            while not self.__upload_queue.empty():
-                try:
-                    self.__upload_queue.get_nowait()
-                    self.__upload_queue.task_done()
-                except queue.Empty:
-                    break
+            self._drain_upload_queue()
             self._clear_queue_folder(info.key)
 
         else:
             logger.info(f"[{info.key}][activate] Same stream id. Updating isLive")
-            data = self._file_to_dict(info.key)
             data["isLive"] = True
             data["streamTitle"] = info.stream_title
             data["startTime"] = info.start_time
-            self._dict_to_file(info.key, data)
+            self._write_header(info.key, data)
 
         if self.__enable_request:
             logger.debug(
@@ -139,7 +194,8 @@ class Storage(metaclass=SingletonMeta):
             try:
                 # Using persistent session
                 response = self._post_with_retry(
-                    f"{self.__base_url_session}/{info.key}/activate?id={quote(info.stream_id)}&title={quote(info.stream_title)}&startTime={quote(info.start_time)}&mediaType={quote(info.media_type)}",
+                    f"{self.__base_url_session}/{info.key}/activate",
+                    params={"id": info.stream_id, "title": info.stream_title, "startTime": info.start_time, "mediaType": info.media_type},
                     timeout=(5, 10),  # (connect timeout, read timeout)
                 )
                 storage_time = time.time() - start_time
@@ -162,13 +218,15 @@ class Storage(metaclass=SingletonMeta):
         start_time = time.time()
         data = self._file_to_dict(key)
         data["isLive"] = False
-        self._dict_to_file(key, data)
+        self._write_header(key, data)
+        self._close_transcript_file(key)
 
         if self.__enable_request and stream_id != "":
             storage_time = time.time() - start_time
             try:
                 response = self._post_with_retry(
-                    f"{self.__base_url_session}/{key}/deactivate?id={quote(stream_id)}",
+                    f"{self.__base_url_session}/{key}/deactivate",
+                    params={"id": stream_id},
                     timeout=(5, 10),  # (connect timeout, read timeout)
                 )
                 storage_time = time.time() - start_time
@@ -184,14 +242,14 @@ class Storage(metaclass=SingletonMeta):
             # local only, so we should log
             logger.info(f"[{key}][deactivate] Stream {stream_id} successfully deactivated")
 
-    def add_new_line(self, key: str, line: dict, raw_bytes: bytes | None):
+    def add_new_line(self, key: str, line: dict, raw_bytes: bytes | bytearray | None):
         """Sends new line transcript to the server. Automatically sets the line id to the next number.
         If the server is out of sync, and responds with 409, then we call sync_server to reset the servers state.
 
         Args:
             key (str): server key
             line (dict): {'id': -1, 'timestamp': 123, 'segments': [{'timestamp' 123, 'text': 'abc'}]}
-            raw_bytes (bytes | None): the raw media binary. The type of media is determined by what the stream was activated with. If None, then no media is uploaded.
+            raw_bytes (bytes | bytearray | None): the raw media binary. The type of media is determined by what the stream was activated with. If None, then no media is uploaded.
         """
         storage_start_time = time.time()
         data = self._file_to_dict(key)
@@ -202,8 +260,7 @@ class Storage(metaclass=SingletonMeta):
             last_id = transcript[-1]["id"]
         line["id"] = last_id + 1
         transcript.append(line)
-        data["transcript"] = transcript
-        self._dict_to_file(key, data)
+        self._append_line(key, line)
 
         if self.__enable_request:
             storage_time = time.time() - storage_start_time
@@ -223,34 +280,22 @@ class Storage(metaclass=SingletonMeta):
                         f"[{key}][add_new_line][{(storage_time):.3f}] Relay did not accept line request. Response: {response.status_code} {response.text}"
                     )
                 else:
-                    logger.debug(f"[{key}][add_new_line][{(storage_time):.3f}] successfully sent {line}")
+                    # Lazy %-args: repr(line) is only built when DEBUG is enabled.
+                    logger.debug("[%s][add_new_line][%.3f] successfully sent %s", key, storage_time, line)
                     # We need to enqueue after the line is sent so that the server bc the server needs the line to exist before it can add the media
                     self._enqueue_media(key, stream_id, line["id"], raw_bytes)
             except requests.RequestException as e:
                 logger.error(f"Unable to send line request to relay: {e}")
         else:
             # request disabled, so we append new line to local file
-            line_text = []
             line_time = line["timestamp"]
-            start_time = int(data.get("startTime", "0"))
-            if "segments" in line:
-                for segment in line["segments"]:
-                    if "text" in segment:
-                        line_text.append(segment["text"])
-            total_seconds = line_time - start_time
-            hours = total_seconds // 3600
-            remaining_seconds = total_seconds % 3600
-            minutes = remaining_seconds // 60
-            seconds = remaining_seconds % 60
-            timestamp = (
-                f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-                if start_time > 0
-                else f"{datetime.fromtimestamp(line_time - start_time).strftime('%H:%M:%S')}"
-            )
-            with open(self._get_transcript_file(key), "a") as f:
-                f.write(f"[{timestamp}] {' '.join(line_text)}\n")
+            start_time = self._get_start_seconds(key, data)
+            line_text = " ".join(segment["text"] for segment in line.get("segments", ()) if "text" in segment)
+            # Without a start time there is nothing to measure from, so fall back to the local wall clock.
+            timestamp = _fmt_hms(line_time - start_time) if start_time > 0 else time.strftime("%H:%M:%S", time.localtime(line_time))
+            self._write_transcript(key, f"[{timestamp}] {line_text}\n")
             storage_time = time.time() - storage_start_time
-            logger.debug(f"[{key}][add_new_line][{(storage_time):.3f}] successfully wrote {line}")
+            logger.debug("[%s][add_new_line][%.3f] successfully wrote %s", key, storage_time, line)
 
     def poll_events(self, keys: list[str], since: int, wait_seconds: int) -> tuple[dict[str, list[str]], int] | None:
         """Long-polls the server's GET /events endpoint for pending worker
@@ -446,44 +491,185 @@ class Storage(metaclass=SingletonMeta):
             except requests.RequestException as e:
                 logger.error(f"[{key}][sync_server][{(storage_time):.3f}] Unable to send sync request to relay: {e}")
 
+    def _get_paths(self, key: str) -> _KeyPaths:
+        paths = self.__paths.get(key)
+        if paths is None:
+            key_dir = os.path.join(_PROJECT_ROOT, "tmp", key)
+            paths = _KeyPaths(
+                marshal=os.path.join(key_dir, "data.marshal"),
+                header=os.path.join(key_dir, "header.json"),
+                log=os.path.join(key_dir, "transcript.jsonl"),
+                transcript=os.path.join(key_dir, "transcript.text"),
+                queue=os.path.join(key_dir, "queue"),
+            )
+            self.__paths[key] = paths
+        return paths
+
     def _get_marshal_file(self, key: str):
-        project_root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        marshal_path = os.path.join(project_root_dir, "tmp", key, "data.marshal")
-        return marshal_path
+        """Legacy single-file state written by older versions. Only read to migrate it."""
+        return self._get_paths(key).marshal
+
+    def _get_header_file(self, key: str):
+        return self._get_paths(key).header
+
+    def _get_log_file(self, key: str):
+        return self._get_paths(key).log
 
     def _get_transcript_file(self, key: str):
-        project_root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        transcript_path = os.path.join(project_root_dir, "tmp", key, "transcript.text")
-        return transcript_path
+        return self._get_paths(key).transcript
 
     def _get_queue_folder(self, key: str):
-        project_root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        queue_path = os.path.join(project_root_dir, "tmp", key, "queue")
-        return queue_path
-
-    def _get_active_id(self, key: str) -> str:
-        initial_state = self._file_to_dict(key)
-        return initial_state["streamId"]
+        return self._get_paths(key).queue
 
     def _file_to_dict(self, key: str) -> dict:
+        """Loads the full state for key: the header fields plus every line in the transcript log.
+        A legacy data.marshal left by an older version is migrated to the header + log layout.
+        Disk is only read the first time; afterwards the cached state is returned."""
+        cached = self._state.get(key)
+        if cached is not None:
+            return cached
+
         data = {"streamId": ""}
         try:
-            with open(self._get_marshal_file(key), "rb") as file:
-                data = marshal.load(file)
+            with open(self._get_header_file(key), "rb") as file:
+                data = json.load(file)
+            data["transcript"] = self._read_log(key)
+            self._state[key] = data
+        except FileNotFoundError:
+            data = self._migrate_legacy_file(key) or data
         except Exception:
             pass
 
         return data
 
     def _dict_to_file(self, key: str, data: dict):
-        # Serialize the dictionary to a file
+        """Persists the full state for key, rewriting both the header and the transcript log."""
+        self._state[key] = data
+        self._write_header(key, data)
         try:
-            with open(self._get_marshal_file(key), "wb") as file:
-                marshal.dump(data, file)
+            records = b"".join(self._encode_line(line) for line in data.get("transcript", []))
+            # Held across close and replace so an append can't reopen the old inode in between.
+            with self.__log_lock:
+                self._close_log(key)
+                self._replace_file(self._get_log_file(key), records)
         except Exception:
             pass
 
-    def _enqueue_media(self, key: str, stream_id: str, line_id: int, raw_bytes: bytes | None):
+    def _write_header(self, key: str, data: dict):
+        """Persists every field of the state except the transcript, which lives in the log."""
+        header = {k: v for k, v in data.items() if k != "transcript"}
+        cached = self._state.get(key)
+        if cached is not None and cached is not data:
+            cached.update(header)
+        with contextlib.suppress(Exception):
+            self._replace_file(self._get_header_file(key), json.dumps(header, separators=_JSON_SEPARATORS).encode("utf-8"))
+
+    @staticmethod
+    def _replace_file(path: str, content: bytes):
+        """Writes content to a sibling temp file and renames it over path, so a crash
+        mid-write leaves the previous file intact instead of a truncated one."""
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as file:
+                file.write(content)
+            os.replace(tmp_path, path)  # atomic on the same filesystem
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+
+    def _append_line(self, key: str, line: dict):
+        """Appends a single line record to the transcript log with one write."""
+        try:
+            record = self._encode_line(line)
+            with self.__log_lock:
+                log_file = self.__log_files.get(key)
+                if log_file is None:
+                    log_file = open(self._get_log_file(key), "ab", buffering=0)  # noqa: SIM115 - kept open across lines
+                    self.__log_files[key] = log_file
+                log_file.write(record)
+        except Exception as e:
+            logger.error(f"[{key}][append_line] Error appending line to transcript log: {e}")
+
+    def _get_start_seconds(self, key: str, data: dict) -> int:
+        """startTime of the active stream as whole epoch seconds, parsed once per activation.
+        yt-dlp can report fractional epochs (e.g. "1700000000.5"), so go through float."""
+        start = self.__start_seconds.get(key)
+        if start is None:
+            try:
+                start = int(float(data.get("startTime", "0")))
+            except (TypeError, ValueError):
+                start = 0
+            self.__start_seconds[key] = start
+        return start
+
+    def _write_transcript(self, key: str, text: str, reset: bool = False):
+        """Writes text to key's local transcript.text, opening it if needed. reset truncates the file first."""
+        with self.__transcript_lock:
+            f = self.__transcript_files.get(key)
+            if reset or f is None:
+                if f is not None:
+                    with contextlib.suppress(OSError):
+                        f.close()
+                f = open(self._get_transcript_file(key), "w" if reset else "a", buffering=1)  # noqa: SIM115 - kept open for the stream
+                self.__transcript_files[key] = f
+            f.write(text)
+
+    def _close_transcript_file(self, key: str):
+        with self.__transcript_lock:
+            f = self.__transcript_files.pop(key, None)
+            if f is not None:
+                with contextlib.suppress(OSError):
+                    f.close()
+
+    def _close_log(self, key: str):
+        with self.__log_lock:
+            log_file = self.__log_files.pop(key, None)
+            if log_file is not None:
+                with contextlib.suppress(OSError):
+                    log_file.close()
+
+    @staticmethod
+    def _encode_line(line: dict) -> bytes:
+        # json escapes newlines inside strings, so every record is exactly one line.
+        return json.dumps(line, separators=_JSON_SEPARATORS).encode("utf-8") + b"\n"
+
+    def _read_log(self, key: str) -> list[dict]:
+        """Decodes every line record in the transcript log. A partial trailing record left by an
+        interrupted write is dropped and truncated away so later appends start on a fresh line."""
+        path = self._get_log_file(key)
+        try:
+            with open(path, "rb") as file:
+                content = file.read()
+        except FileNotFoundError:
+            return []
+
+        complete, _, partial = content.rpartition(b"\n")
+        lines = [json.loads(record) for record in complete.split(b"\n")] if complete else []
+
+        if partial:
+            logger.warning(f"[{key}][read_log] Dropping partial record at the end of {path}")
+            with self.__log_lock:
+                self._close_log(key)
+                os.truncate(path, len(content) - len(partial))
+        return lines
+
+    def _migrate_legacy_file(self, key: str) -> dict | None:
+        legacy_path = self._get_marshal_file(key)
+        try:
+            with open(legacy_path, "rb") as file:
+                data = marshal.load(file)
+        except Exception:
+            return None
+
+        logger.info(f"[{key}][storage] Migrating {legacy_path} to header + transcript log")
+        self._dict_to_file(key, data)
+        if os.path.exists(self._get_header_file(key)) and os.path.exists(self._get_log_file(key)):
+            with contextlib.suppress(OSError):
+                os.remove(legacy_path)
+        return data
+
+    def _enqueue_media(self, key: str, stream_id: str, line_id: int, raw_bytes: bytes | bytearray | None):
         """Saves media to disk and enqueues it for upload.
 
         Uses an atomic write (write to .tmp then rename) so that a process killed
@@ -498,9 +684,17 @@ class Storage(metaclass=SingletonMeta):
         queue_folder = self._get_queue_folder(key)
         media_path = os.path.join(queue_folder, f"media_stream_id={stream_id} line_id={line_id}.bin")
         tmp_path = media_path + ".tmp"
+        with self.__enqueues_done:
+            self.__pending_enqueues += 1
         try:
-            with open(tmp_path, "wb") as f:
-                f.write(raw_bytes)
+            # Plain fd writes: one unbuffered blob doesn't need Python's buffered IO layer.
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                view = memoryview(raw_bytes)
+                while view:
+                    view = view[os.write(fd, view) :]
+            finally:
+                os.close(fd)
             os.replace(tmp_path, media_path)  # atomic on the same filesystem
             new_media = MediaUploadObject(key, stream_id, line_id, media_path)
             self.__upload_queue.put(new_media)
@@ -508,48 +702,120 @@ class Storage(metaclass=SingletonMeta):
             logger.error(f"[{key}][enqueue_media] Error saving media to disk: {e}")
             with contextlib.suppress(OSError):
                 os.remove(tmp_path)
+        finally:
+            with self.__enqueues_done:
+                self.__pending_enqueues -= 1
+                if self.__pending_enqueues == 0:
+                    self.__enqueues_done.notify_all()
 
     def _clear_queue_folder(self, key):
-        """Clears the queue folder for the given key. First deletes the folder then recreates it"""
+        """Clears the queue folder for the given key. The old folder is renamed aside and an empty one
+        created right away. The old files are deleted on a background thread so activation doesn't wait on them.
+        """
         queue_folder = self._get_queue_folder(key)
         logger.debug(f"[{key}][clear_queue_folder] clearing queue folder {queue_folder}")
 
         if os.path.exists(queue_folder):
             try:
-                shutil.rmtree(queue_folder)
+                os.rename(queue_folder, f"{queue_folder}.old-{time.time_ns()}")
             except OSError as e:
-                logger.error(f"[{key}][clear_queue_folder] Error deleting queue folder {queue_folder}: {e}")
-            except Exception as e:
-                logger.error(f"[{key}][clear_queue_folder] unknown error deleting queue foler {queue_folder}: {e}")
+                logger.warning(f"[{key}][clear_queue_folder] Unable to move queue folder aside, deleting in place: {e}")
+                try:
+                    self._unlink_files(queue_folder)
+                except OSError as e:
+                    logger.error(f"[{key}][clear_queue_folder] Error deleting queue folder {queue_folder}: {e}")
 
         # Recreate the empty folder
         try:
-            os.makedirs(queue_folder)
+            os.makedirs(queue_folder, exist_ok=True)
         except OSError as e:
             logger.error(f"[{key}][clear_queue_folder] Error recreating queue folder {queue_folder}: {e}")
         except Exception as e:
             logger.error(f"[{key}][clear_queue_folder] unknown error recreating queue foler {queue_folder}: {e}")
 
+        threading.Thread(target=self._delete_old_queue_folders, args=(key,), daemon=True).start()
         logger.debug(f"[{key}][clear_queue_folder] successfully cleared queue folder")
 
+    def _delete_old_queue_folders(self, key):
+        """Deletes every queue folder moved aside by _clear_queue_folder, including ones left by a previous run."""
+        queue_folder = self._get_queue_folder(key)
+        parent = os.path.dirname(queue_folder)
+        prefix = f"{os.path.basename(queue_folder)}.old-"
+        try:
+            with os.scandir(parent) as entries:
+                old_folders = [entry.path for entry in entries if entry.name.startswith(prefix) and entry.is_dir(follow_symlinks=False)]
+        except OSError:
+            return
+        for folder in old_folders:
+            try:
+                self._unlink_files(folder)
+                os.rmdir(folder)
+            except OSError:
+                # Not the flat layout we wrote (or partly gone already), fall back to a full recursive delete.
+                shutil.rmtree(folder, ignore_errors=True)
+
+    @staticmethod
+    def _unlink_files(folder: str):
+        """Deletes the files directly inside folder. Queue folders only ever hold flat media files."""
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    with contextlib.suppress(FileNotFoundError):
+                        os.unlink(entry.path)
+
+    def _put_uploads(self, items: list[MediaUploadObject]):
+        """Enqueues every item under a single hold of the queue's mutex, in order."""
+        upload_queue = self.__upload_queue
+        with upload_queue.mutex:
+            upload_queue.queue.extend(items)
+            upload_queue.unfinished_tasks += len(items)
+            upload_queue.not_empty.notify(len(items))
+
+    def _drain_upload_queue(self):
+        """Drops every pending upload under a single hold of the queue's mutex, so nothing
+        enqueued concurrently can slip in between checking and taking items."""
+        upload_queue = self.__upload_queue
+        with upload_queue.mutex:
+            dropped = len(upload_queue.queue)
+            upload_queue.queue.clear()
+            # Only account for the dropped items; an upload already in flight still calls task_done.
+            upload_queue.unfinished_tasks -= dropped
+            if upload_queue.unfinished_tasks == 0:
+                upload_queue.all_tasks_done.notify_all()
+
     def _media_upload_worker(self):
         while True:
             item = self.__upload_queue.get()
             start_time = time.time()
-            if os.path.exists(item.path):
+            try:
+                f = open(item.path, "rb")  # noqa: SIM115 - closed by the with below, after the missing-file check
+            except FileNotFoundError:
+                # Already gone, e.g. the queue folder was cleared for a new stream.
+                self.__upload_queue.task_done()
+                continue
+            except Exception as e:
+                logger.error(f"[{item.key}][upload_media][{item.id}] Error opening file {item.path}: {e}")
+                self.__upload_queue.task_done()
+                continue
+
+            with f:
                 if self.__enable_request:
                     try:
-                        logger.debug(f"[{item.key}][upload_media][{item.stream_id}][{item.id}] uploading media")
-                        with open(item.path, "rb") as f:
-                            files = {"file": f}
-                            response = self._post_with_retry(
-                                f"{self.__base_url_session}/{item.key}/media/{item.stream_id}/{item.id}",
-                                files=files,
-                                timeout=(5, 60),  # (connect timeout, read timeout)
-                            )
-                            logger.debug(
-                                f"[{item.key}][upload_media][{item.stream_id}][{item.id}] media upload response: {response.status_code} {response.text}"
-                            )
+                        logger.debug("[%s][upload_media][%s][%s] uploading media", item.key, item.stream_id, item.id)
+                        files = {"file": f}
+                        response = self._post_with_retry(
+                            f"{self.__base_url_session}/{item.key}/media/{item.stream_id}/{item.id}",
+                            files=files,
+                            timeout=(5, 60),  # (connect timeout, read timeout)
+                        )
+                        logger.debug(
+                            "[%s][upload_media][%s][%s] media upload response: %s %s",
+                            item.key,
+                            item.stream_id,
+                            item.id,
+                            response.status_code,
+                            response.text,
+                        )
                         storage_time = time.time() - start_time
                         if response.status_code == 500:
                             logger.error(
@@ -560,15 +826,17 @@ class Storage(metaclass=SingletonMeta):
                                 f"[{item.key}][upload_media][{item.id}][{(storage_time):.3f}] Relay did not accept media upload. Response: {response.status_code} {response.text}"
                             )
                         else:
-                            logger.debug(f"[{item.key}][upload_media][{item.id}][{(storage_time):.3f}] successfully uploaded media")
+                            logger.debug("[%s][upload_media][%s][%.3f] successfully uploaded media", item.key, item.id, storage_time)
                     except Exception as e:
                         logger.error(f"[{item.key}][upload_media][{item.id}] Error uploading media: {e}")
 
-                # Delete file after attempt
-                try:
-                    os.remove(item.path)
-                except Exception as e:
-                    logger.error(f"[{item.key}][upload_media][{item.id}] Error deleting file {item.path}: {e}")
+            # Delete file after attempt
+            try:
+                os.remove(item.path)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.error(f"[{item.key}][upload_media][{item.id}] Error deleting file {item.path}: {e}")
 
             self.__upload_queue.task_done()
 
@@ -584,27 +852,22 @@ class Storage(metaclass=SingletonMeta):
             if not key:
                 continue
             queue_folder: str = self._get_queue_folder(key)
-            if not os.path.exists(queue_folder) or not os.path.isdir(queue_folder):
-                continue
-
             files: list[tuple[int, str, str]] = []
-            for filename in os.listdir(queue_folder):
-                if filename.startswith("media_") and filename.endswith(".bin"):
-                    try:
-                        pattern = r"media_stream_id=(.*)\sline_id=(.*)\.bin"
-                        match = re.search(pattern, filename)
+            try:
+                # DirEntry carries the full path and file type from the directory read itself.
+                with os.scandir(queue_folder) as entries:
+                    for entry in entries:
+                        filename = entry.name
+                        if not (filename.startswith("media_") and filename.endswith(".bin") and entry.is_file()):
+                            continue
+                        match = _MEDIA_FILE_RE.search(filename)
                         if match:
-                            stream_id = match.group(1)
-                            line_id = int(match.group(2))
-                            files.append(
-                                (
-                                    line_id,
-                                    stream_id,
-                                    os.path.join(queue_folder, filename),
-                                )
-                            )
-                    except ValueError:
-                        continue
+                            try:
+                                files.append((int(match.group(2)), match.group(1), entry.path))
+                            except ValueError:
+                                continue
+            except (FileNotFoundError, NotADirectoryError):
+                continue
 
             if files:
                 files.sort()  # Sort by line_id to ensure order within each key
@@ -615,30 +878,36 @@ class Storage(metaclass=SingletonMeta):
 
         # Interleave files from different keys (BFS-like ordering)
         sorted_keys = sorted(all_keys_files.keys())
-        max_files = max(len(f) for f in all_keys_files.values())
-
-        for i in range(max_files):
-            for key in sorted_keys:
-                if i < len(all_keys_files[key]):
-                    line_id, stream_id, path = all_keys_files[key][i]
+        items: list[MediaUploadObject] = []
+        for group in zip_longest(*(all_keys_files[key] for key in sorted_keys)):
+            for key, file in zip(sorted_keys, group, strict=True):
+                if file is not None:
+                    line_id, stream_id, path = file
                     logger.info(f"[{key}][storage] Enqueuing old media file: {path}")
-                    self.__upload_queue.put(MediaUploadObject(key, stream_id, line_id, path))
+                    items.append(MediaUploadObject(key, stream_id, line_id, path))
+        self._put_uploads(items)
 
     def wait_for_uploads(self, timeout: float = 30):
-        """Waits for the upload queue to be empty.
+        """Waits for every queued media upload to finish.
 
         Args:
             timeout (float): Max time to wait in seconds. Defaults to 30.
         """
         logger.info(f"[storage] Waiting up to {timeout}s for uploads to finish...")
         end_time = time.time() + timeout
-        # Sleep to give _enqueue_media enough time to write any files to disk and enqueue them.
-        time.sleep(3)
-        while not self.__upload_queue.empty():
-            if time.time() > end_time:
+        # Let any in-progress _enqueue_media finish writing its file and enqueue it.
+        with self.__enqueues_done:
+            if not self.__enqueues_done.wait_for(lambda: self.__pending_enqueues == 0, timeout=timeout):
+                logger.warning("[storage] Timeout waiting for media to be enqueued.")
+                return
+        # Queue.join() has no timeout, so wait on the condition it uses. task_done notifies it once
+        # the last upload, including one still in flight, has finished.
+        upload_queue = self.__upload_queue
+        remaining = max(0.0, end_time - time.time())
+        with upload_queue.all_tasks_done:
+            if not upload_queue.all_tasks_done.wait_for(lambda: upload_queue.unfinished_tasks == 0, timeout=remaining):
                 logger.warning("[storage] Timeout waiting for uploads to finish.")
                 return
-            time.sleep(0.5)
         logger.info("[storage] All uploads finished.")
 
     def _post_with_retry(self, url: str, **kwargs):
@@ -649,14 +918,32 @@ class Storage(metaclass=SingletonMeta):
                 response = self.session.post(url, **kwargs)
                 if response.status_code in [200, 208, 409, 500] or attempt == max_attempts:
                     return response  # success, already reported, out of sync, server error, or last attempt - let caller handle it
-                wait = 2**attempt
-                logger.warning(f"Request returned {response.status_code} (attempt {attempt}/{max_attempts}), retrying in {wait}s")
+                wait = self._retry_delay(attempt, response)
+                logger.warning(f"Request returned {response.status_code} (attempt {attempt}/{max_attempts}), retrying in {wait:.1f}s")
                 time.sleep(wait)
             except requests.RequestException as e:
                 last_exc = e
                 if attempt == max_attempts:
                     raise e
-                wait = 2**attempt
-                logger.warning(f"Request failed (attempt {attempt}/{max_attempts}), retrying in {wait}s: {e}")
+                wait = self._retry_delay(attempt)
+                logger.warning(f"Request failed (attempt {attempt}/{max_attempts}), retrying in {wait:.1f}s: {e}")
                 time.sleep(wait)
         raise last_exc
+
+    @staticmethod
+    def _retry_delay(attempt: int, response: requests.Response | None = None) -> float:
+        """Seconds to wait before the next attempt. Honors the server's Retry-After (seconds or
+        HTTP date, capped at 60s), otherwise exponential backoff with jitter so keys don't retry in lockstep.
+        """
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    delay = None
+            if delay is not None:
+                return min(max(delay, 0.0), 60.0)
+        return 2**attempt + random.uniform(0, 1)
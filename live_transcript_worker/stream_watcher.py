@@ -143,6 +143,7 @@ class StreamWatcher:
         if self.process_thread.is_alive():
             self.process_thread.join(timeout=30)
         self.storage.wait_for_uploads(timeout=30)
+        self.storage.close()
 
     def watcher(self, key: str, urls: list[str]):
         """
@@ -175,7 +176,8 @@ class StreamWatcher:
 
             soonest = min(next_url_checks.values()) if next_url_checks else time.time()
             if time.time() < soonest:
-                time.sleep(1)
+                # Returns early on shutdown; the loop condition then exits.
+                self.stop_event.wait(1)
                 continue
 
             id_blacklist = Config.get_id_blacklist_config()
@@ -230,7 +232,7 @@ class StreamWatcher:
                     if not info.is_live:
                         self.storage.deactivate(key, info.stream_id)
                     return
-            time.sleep(0.5)
+            self.stop_event.wait(0.5)
         logger.info(f"[{key}][watcher] out of loop stopping. Using last_stream_id to deactivate.")
         self.storage.deactivate(key, last_stream_id)
 
@@ -295,7 +297,7 @@ class StreamWatcher:
             soonest_url_check = min(next_url_checks.values()) if next_url_checks else next_incoming_poll
             soonest = min(soonest_url_check, next_incoming_poll)
             if time.time() < soonest:
-                time.sleep(1)
+                self.stop_event.wait(1)
                 continue
 
             id_blacklist = Config.get_id_blacklist_config()
@@ -355,7 +357,7 @@ class StreamWatcher:
                     if not info.is_live:
                         self.storage.deactivate(key, info.stream_id)
                     return
-            time.sleep(0.5)
+            self.stop_event.wait(0.5)
         logger.info(f"[{key}][watcher_incoming] out of loop stopping. Using last_stream_id to deactivate.")
         self.storage.deactivate(key, last_stream_id)
 
@@ -469,5 +471,6 @@ class StreamWatcher:
                 continue
             except Exception as e:
                 logger.error(f"[processor] error in processing thread: {e}")
+        audio_processor.close()
         del audio_processor
         logger.info("[processor] thread finished.")
@@ -2,6 +2,7 @@ import json
 import logging
 import os
 import time
+from functools import cached_property
 from queue import Queue
 
 from live_transcript_worker.config import Config
@@ -25,12 +26,31 @@ class Worker:
 
     def __init__(self, key: str, queue: Queue, stop_event: StopEventLike):
         self.key = key
+        self.queue = queue
         self.stop_event = stop_event
-        self.mpeg_fixed_bitrate_worker = MPEGFixedBitrateWorker(key, queue, stop_event)
-        self.mpeg_buffered_worker = MPEGBufferedWorker(key, queue, stop_event)
-        self.dash_worker = DASHWorker(key, queue, stop_event)
-        self.twitch_lfs_worker = TwitchLFSWorker(key, queue, stop_event)
-        self.live_segment_worker = LiveSegmentWorker(key, queue, stop_event)
+
+    # Concrete workers are built on first use, so a Worker only pays for the ones its streams
+    # actually route to. Each is then kept, so state like is_slow carries across start() calls.
+
+    @cached_property
+    def mpeg_fixed_bitrate_worker(self) -> MPEGFixedBitrateWorker:
+        return MPEGFixedBitrateWorker(self.key, self.queue, self.stop_event)
+
+    @cached_property
+    def mpeg_buffered_worker(self) -> MPEGBufferedWorker:
+        return MPEGBufferedWorker(self.key, self.queue, self.stop_event)
+
+    @cached_property
+    def dash_worker(self) -> DASHWorker:
+        return DASHWorker(self.key, self.queue, self.stop_event)
+
+    @cached_property
+    def twitch_lfs_worker(self) -> TwitchLFSWorker:
+        return TwitchLFSWorker(self.key, self.queue, self.stop_event)
+
+    @cached_property
+    def live_segment_worker(self) -> LiveSegmentWorker:
+        return LiveSegmentWorker(self.key, self.queue, self.stop_event)
 
     # ------------------------------------------------------------------
     # Twitch LFS stream-id persistence
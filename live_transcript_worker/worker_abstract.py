@@ -1,11 +1,31 @@
+import contextlib
+import logging
 import os
 from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable
 from queue import Queue
-from typing import Protocol
+from threading import Thread
+from typing import IO, Protocol
 
 from live_transcript_worker.config import Config
 from live_transcript_worker.custom_types import StreamInfoObject
 
+try:
+    import fcntl
+except ImportError:  # Windows, where pipes keep the OS default size
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_YTDLP_PATH = os.path.join(_PROJECT_ROOT, "bin", "yt-dlp")
+
+# Largest single read from a yt-dlp stdout pipe. Reads on the unbuffered pipe return whatever is available up to this.
+PIPE_READ_SIZE = 65536
+# Capacity requested for yt-dlp stdout pipes. Linux defaults to 64 KiB, and unprivileged processes may go up to 1 MiB.
+_PIPE_CAPACITY = 1 << 20
+
 
 class StopEventLike(Protocol):
     """The subset of threading.Event that the workers actually use — just
@@ -25,12 +45,12 @@ class AbstractWorker(ABC):
         self.queue = queue
         self.stop_event = stop_event
 
-        project_root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self.ytdlp_path = os.path.join(project_root_dir, "bin", "yt-dlp")
-        self.buffer_size_seconds: int = Config.get_server_config().get("buffer_size_seconds", 6)
+        server_config = Config.get_server_config()
+        self.ytdlp_path = _YTDLP_PATH
+        self.buffer_size_seconds: int = server_config.get("buffer_size_seconds", 6)
 
         # Stale-detection thresholds (all in seconds).
-        stale_cfg: dict = Config.get_server_config().get("stale_threshold", {}) or {}
+        stale_cfg: dict = server_config.get("stale_threshold", {}) or {}
         # How long to wait for a DASH fragment's tracks to be complete before emitting partial data.
         self.stale_fragment_seconds: int = stale_cfg.get("fragment_seconds", 60)
         # Gap (seconds behind live) at which we fall back to LiveSegmentWorker.
@@ -38,6 +58,7 @@ class AbstractWorker(ABC):
         # No-new-fragment timeout after which we terminate yt-dlp.
         self.stale_ytdlp_seconds: int = stale_cfg.get("ytdlp_seconds", 180)
 
+        # Stream byte rates in bytes per second (not samples or bits), used to size fixed-bitrate chunks.
         self.yt_audio_rate = 20_000
         self.ty_video_rate = 1_028_571
         self.twitch_audio_rate = 25_540
@@ -47,6 +68,39 @@ class AbstractWorker(ABC):
 
         self.is_slow: bool = False
 
+    @staticmethod
+    def enlarge_pipe(pipe: IO[bytes] | None) -> None:
+        """Grows the kernel buffer of a subprocess pipe so yt-dlp can keep writing while the reader is busy,
+        and each read can pick up more at once. Best effort: a no-op where F_SETPIPE_SZ isn't available."""
+        set_pipe_size = getattr(fcntl, "F_SETPIPE_SZ", None)
+        if pipe is None or set_pipe_size is None:
+            return
+        try:
+            fcntl.fcntl(pipe.fileno(), set_pipe_size, _PIPE_CAPACITY)
+        except Exception as e:
+            logger.debug(f"[enlarge_pipe] unable to resize pipe: {e}")
+
+    @staticmethod
+    def drain_pipe(pipe: IO[bytes]) -> Callable[[float], str]:
+        """Reads pipe until EOF on a daemon thread, so a chatty child can never block on a full stderr pipe
+        while we're only reading its stdout. Only the tail is kept. Returns a function that waits up to
+        timeout seconds for EOF and returns what was read, decoded."""
+        chunks: deque[bytes] = deque(maxlen=16)
+
+        def reader():
+            with contextlib.suppress(OSError, ValueError):
+                for chunk in iter(lambda: pipe.read(4096), b""):
+                    chunks.append(chunk)
+
+        thread = Thread(target=reader, daemon=True)
+        thread.start()
+
+        def collect(timeout: float) -> str:
+            thread.join(timeout)
+            return b"".join(chunks).decode(errors="ignore")
+
+        return collect
+
     @abstractmethod
     def start(self, info: StreamInfoObject) -> None:
         """Starts working on the given url."""
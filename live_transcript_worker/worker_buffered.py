@@ -1,11 +1,13 @@
+import contextlib
 import logging
 import subprocess
+import sys
 import time
-from threading import Event, Lock, Thread
+from threading import Condition, Event, Lock, Thread
 
 from live_transcript_worker.custom_types import ProcessObject, StreamInfoObject
 from live_transcript_worker.helper import StreamHelper
-from live_transcript_worker.worker_abstract import AbstractWorker
+from live_transcript_worker.worker_abstract import PIPE_READ_SIZE, AbstractWorker
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +26,9 @@ class MPEGBufferedWorker(AbstractWorker):
     def start(self, info: StreamInfoObject):
         self.ytdlp_stopped = Event()
         self.buffer_lock = Lock()
+        # The downloader notifies once the buffer reaches wake_size bytes, the reader's estimate of a full window.
+        self.data_available = Condition(self.buffer_lock)
+        self.wake_size = 0
         self.buffer = bytearray()
         download_thread = Thread(target=self.downloader, args=(info,), daemon=True)
         download_thread.start()
@@ -31,42 +36,48 @@ class MPEGBufferedWorker(AbstractWorker):
         audio_start_time = time.time() - self.live_latency_seconds
         next_start_time = 0
         min_buffer_size = 8192
-        should_sleep = False
+        # Bitrate seen by the latest probe. Predicts how many bytes the next window needs before it's worth probing.
+        bytes_per_second = 0.0
         logger.info(f"[{info.key}][MPEGBufferedWorker] Starting buffer reader")
         while not self.stop_event.is_set() and not self.ytdlp_stopped.is_set():
-            if should_sleep:
-                time.sleep(1)
-                should_sleep = False
             with self.buffer_lock:
                 next_start_time = (
                     time.time() - self.live_latency_seconds
                 )  # Once we process the buffer, the current time is when the next buffer starts
-                if not self.buffer:
-                    should_sleep = True
+                buffer_len = len(self.buffer)
+                if buffer_len < min_buffer_size:
+                    self.wake_size = max(min_buffer_size, int(bytes_per_second * self.buffer_size_seconds))
+                    self.data_available.wait(timeout=1)
                     continue
-                buffer_copy = bytes(self.buffer)
-                if len(buffer_copy) < min_buffer_size or StreamHelper.get_duration(buffer_copy) < self.buffer_size_seconds:
-                    should_sleep = True
+                # Probe the buffer in place and only copy it out once it's ready to be queued.
+                duration = StreamHelper.get_duration(self.buffer)
+                if duration > 0:
+                    bytes_per_second = buffer_len / duration
+                if duration < self.buffer_size_seconds:
+                    # Sleep until the buffer should hold a full window at the bitrate seen so far. The timeout
+                    # bounds a bad estimate (or a failed probe) to the previous once-a-second polling.
+                    self.wake_size = int(bytes_per_second * self.buffer_size_seconds) if duration > 0 else sys.maxsize
+                    self.data_available.wait(timeout=1)
                     continue
 
+                # Hand the filled buffer to the queue and start a fresh one rather than copying it out.
                 process_obj = ProcessObject(
-                    raw=buffer_copy,
+                    raw=self.buffer,
                     audio_start_time=audio_start_time,
                     key=info.key,
                     media_type=info.media_type,
                     vod_accurate=False,
                 )
+                self.buffer = bytearray()
                 logger.debug(f"[{info.key}][MPEGBufferedWorker] Adding audio to queue.")
                 self.queue.put(process_obj)
                 audio_start_time = next_start_time
-                self.buffer.clear()
 
         with self.buffer_lock:
-            buffer_copy = bytes(self.buffer)
-            if len(buffer_copy) >= min_buffer_size:
+            if len(self.buffer) >= min_buffer_size:
                 # Exited but there is still data in the buffer.
                 process_obj = ProcessObject(
-                    raw=buffer_copy,
+                    raw=self.buffer,
                     audio_start_time=audio_start_time,
                     key=info.key,
                     media_type=info.media_type,
@@ -84,21 +95,27 @@ class MPEGBufferedWorker(AbstractWorker):
 
         if process is None:
             logger.error(f"[{info.key}][MPEGBufferedWorker] process failed to start.")
-            self.ytdlp_stopped.set()
+            self._downloader_stopped()
             return
 
         if process.stdout is None or process.stderr is None:
             logger.error(f"[{info.key}][MPEGBufferedWorker] yt-dlp process failed to start.")
-            self.ytdlp_stopped.set()
+            self._downloader_stopped()
             return
 
+        read_stderr = self.drain_pipe(process.stderr)
+        # Read into one reusable buffer instead of allocating a new bytes object per read.
+        chunk_buf = bytearray(PIPE_READ_SIZE)
+        chunk_view = memoryview(chunk_buf)
         while not self.stop_event.is_set():
-            chunk = process.stdout.read(4096)
-            if not chunk:
-                process.poll()
+            n = process.stdout.readinto(chunk_buf)
+            if not n:
+                # EOF means yt-dlp closed stdout, so it is exiting; give it a moment rather than a single poll.
+                with contextlib.suppress(subprocess.TimeoutExpired):
+                    process.wait(timeout=5)
                 if process.returncode is not None:
                     logger.info(f"[{info.key}][MPEGBufferedWorker] yt-dlp process ended with code {process.returncode}.")
-                    stderr_output = process.stderr.read().decode(errors="ignore")
+                    stderr_output = read_stderr(5)
                     if stderr_output:
                         logger.debug(f"[{info.key}][MPEGBufferedWorker] yt-dlp stderr:\n{stderr_output}")
                     if process.returncode != 0:
@@ -110,12 +127,20 @@ class MPEGBufferedWorker(AbstractWorker):
                 break
 
             with self.buffer_lock:
-                self.buffer.extend(chunk)
+                self.buffer.extend(chunk_view[:n])
+                if len(self.buffer) >= self.wake_size:
+                    self.data_available.notify()
 
         logger.info(f"[{info.key}][MPEGBufferedWorker] Stopping downloader")
-        self.ytdlp_stopped.set()
+        self._downloader_stopped()
         return
 
+    def _downloader_stopped(self):
+        """Marks the downloader as stopped and wakes the reader so it flushes without waiting out its timeout."""
+        with self.buffer_lock:
+            self.ytdlp_stopped.set()
+            self.data_available.notify_all()
+
     def create_process(self, info: StreamInfoObject) -> subprocess.Popen[bytes] | None:
         process = None
         logger.debug(f"[{info.key}][MPEGBufferedWorker][create_process] creating yt-dlp download process")
@@ -130,6 +155,7 @@ class MPEGBufferedWorker(AbstractWorker):
                 info.url,
             ]
             process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0)
+            self.enlarge_pipe(process.stdout)
             logger.debug(f"[{info.key}][MPEGBufferedWorker][create_process] successfully created yt-dlp download process.")
             return process
         except FileNotFoundError:
@@ -8,6 +8,7 @@ import shutil
 import subprocess
 import tempfile
 import time
+from collections.abc import Callable
 
 import av
 
@@ -21,6 +22,9 @@ from live_transcript_worker.worker_abstract import AbstractWorker
 
 logger = logging.getLogger(__name__)
 
+# Fragment files are named id.format_id.FragN (see create_process).
+_FRAG_RE = re.compile(r"Frag(\d+)")
+
 
 class DASHWorker(AbstractWorker):
     """
@@ -35,6 +39,9 @@ class DASHWorker(AbstractWorker):
     5. Handle restarts by tracking state in a file.
     """
 
+    # (state_path, stream_id, last_sequence, current_stream_time) last written by _save_state.
+    _saved_state: tuple[str, str, int, float] | None = None
+
     def start(self, info: StreamInfoObject):
         logger.info(f"[{info.key}][DASHWorker] Starting")
 
@@ -115,14 +122,9 @@ class DASHWorker(AbstractWorker):
 
         # Cleanup final file if it exists to prevent yt-dlp from skipping download
         try:
-            files = glob.glob(os.path.join(fragment_dir, f"{info.stream_id}*"))
-            for f in files:
-                if os.path.isfile(f) and "Frag" not in f:
-                    try:
-                        os.remove(f)
-                        logger.info(f"[{info.key}][DASHWorker] Deleted existing final file {f} to prevent yt-dlp from skipping.")
-                    except Exception as e:
-                        logger.warning(f"[{info.key}][DASHWorker] Failed to delete file {f}: {e}")
+            removed = self._unlink_files(fragment_dir, lambda name: name.startswith(info.stream_id) and "Frag" not in name)
+            for name in removed:
+                logger.info(f"[{info.key}][DASHWorker] Deleted existing final file {name} to prevent yt-dlp from skipping.")
         except Exception as e:
             logger.warning(f"[{info.key}][DASHWorker] Error during final file cleanup: {e}")
 
@@ -336,15 +338,33 @@ class DASHWorker(AbstractWorker):
     def _cleanup(self, info: StreamInfoObject, fragment_dir: str):
         if os.path.exists(fragment_dir):
             try:
-                shutil.rmtree(fragment_dir)
-            except Exception as e:
-                logger.warning(f"[{info.key}][DASHWorker] Failed to cleanup dir {fragment_dir}: {e}")
-                # rmtree failed partially — mop up remaining stream files.
-                if info.stream_id:
-                    for f in glob.glob(os.path.join(fragment_dir, f"{info.stream_id}*")):
-                        with contextlib.suppress(Exception):
-                            if os.path.isfile(f):
-                                os.remove(f)
+                # The fragment dir is flat, so unlink its files in one pass and remove it.
+                self._unlink_files(fragment_dir)
+                os.rmdir(fragment_dir)
+            except OSError:
+                # Something other than a plain file was left behind.
+                try:
+                    shutil.rmtree(fragment_dir)
+                except Exception as e:
+                    logger.warning(f"[{info.key}][DASHWorker] Failed to cleanup dir {fragment_dir}: {e}")
+
+    @staticmethod
+    def _unlink_files(folder: str, should_unlink: Callable[[str], bool] | None = None) -> list[str]:
+        """
+        Deletes the files directly inside folder whose name passes should_unlink (all of them if None).
+        Files that can't be deleted are skipped. Returns the names of the deleted files.
+        """
+        removed = []
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if not entry.is_file(follow_symlinks=False) or (should_unlink is not None and not should_unlink(entry.name)):
+                    continue
+                try:
+                    os.unlink(entry.path)
+                    removed.append(entry.name)
+                except OSError:
+                    continue
+        return removed
 
     def _is_complete_av(self, file_path: str) -> bool:
         """Checks if a file contains both video and audio streams."""
@@ -356,6 +376,24 @@ class DASHWorker(AbstractWorker):
         except Exception:
             return False
 
+    def _is_complete_av_format(self, file_path: str, complete_av_formats: set[str]) -> bool:
+        """
+        Like _is_complete_av, but remembers formats that passed. yt-dlp keeps one format per run,
+        so a combined format is only probed on its first fragment. Failures aren't cached, since a
+        video-only format is just waiting on its audio file and a failed probe may be transient.
+        """
+        name = os.path.basename(file_path)
+        match = _FRAG_RE.search(name)
+        if match is None:
+            return self._is_complete_av(file_path)
+        fmt = name[: match.start()]
+        if fmt in complete_av_formats:
+            return True
+        if self._is_complete_av(file_path):
+            complete_av_formats.add(fmt)
+            return True
+        return False
+
     def _load_state(self, state_path: str, current_stream_id: str, default_start_time: float) -> tuple[int, float]:
         """Loads the last processed sequence and current stream time from the state file."""
         if os.path.exists(state_path):
@@ -375,7 +413,10 @@ class DASHWorker(AbstractWorker):
         last_sequence: int,
         current_stream_time: float,
     ):
-        """Saves the current state atomically (write to temp file, then rename)."""
+        """Saves the current state atomically (write to temp file, then rename). Skips the write if it matches the last save."""
+        state = (state_path, stream_id, last_sequence, current_stream_time)
+        if state == self._saved_state and os.path.exists(state_path):
+            return
         try:
             dir_name = os.path.dirname(state_path)
             fd, tmp_path = tempfile.mkstemp(dir=dir_name, suffix=".tmp")
@@ -390,6 +431,7 @@ class DASHWorker(AbstractWorker):
                         f,
                     )
                 os.replace(tmp_path, state_path)
+                self._saved_state = state
             except BaseException:
                 with contextlib.suppress(OSError):
                     os.unlink(tmp_path)
@@ -425,6 +467,11 @@ class DASHWorker(AbstractWorker):
         # Stall watchdog: detect when yt-dlp is alive but producing no new fragments
         last_new_fragment_time: float = time.time()
 
+        # Sequence number parsed from each filename seen so far. Fragments are kept on disk, so this saves re-parsing them every tick.
+        fragment_seqs: dict[str, int | None] = {}
+        # Filename prefixes (id.format_id.) whose fragments are known to carry both video and audio.
+        complete_av_formats: set[str] = set()
+
         while not self.stop_event.is_set():
             if process.poll() is not None:
                 if process.returncode != 0 and last_seq == start_seq:
@@ -439,36 +486,7 @@ class DASHWorker(AbstractWorker):
                     logger.info(f"[{info.key}][DASHWorker] yt-dlp process ended.")
                 break
 
-            files = glob.glob(os.path.join(fragment_dir, "*"))
-
-            # Filter valid fragment files
-            valid_files = [f for f in files if "Frag" in f and not f.endswith(".part") and not f.endswith(".ytdl")]
-
-            # Group files by sequence
-            pending_fragments: dict[int, list[str]] = {}
-            for f_path in valid_files:
-                filename = os.path.basename(f_path)
-                match = re.search(r"Frag(\d+)", filename)
-                if not match:
-                    continue
-
-                seq = int(match.group(1))
-
-                # Skip fragments we have already processed
-                if seq <= last_seq:
-                    continue
-
-                if seq not in pending_fragments:
-                    pending_fragments[seq] = []
-
-                try:
-                    if os.path.getsize(f_path) == 0:
-                        continue
-                except OSError:
-                    continue
-
-                if f_path not in pending_fragments[seq]:
-                    pending_fragments[seq].append(f_path)
+            pending_fragments = self._scan_fragments(fragment_dir, last_seq, fragment_seqs)
 
             if not pending_fragments:
                 # Stall watchdog: if yt-dlp has produced no new fragments for a while,
@@ -517,7 +535,7 @@ class DASHWorker(AbstractWorker):
                     # 2. OR 1 file AND it's a complete AV file
                     is_ready = len(files_for_seq) >= 2
                     if not is_ready and len(files_for_seq) == 1:
-                        is_ready = self._is_complete_av(files_for_seq[0])
+                        is_ready = self._is_complete_av_format(files_for_seq[0], complete_av_formats)
                 else:
                     # Audio Mode Condition:
                     # Just need 1 file (the audio track)
@@ -533,24 +551,16 @@ class DASHWorker(AbstractWorker):
                     is_ready = True
 
                 if is_ready:
-                    merged_ts_path = os.path.join(fragment_dir, f"merged_{seq}.ts")
-
                     # Even for audio-only (or partial video-only), we run it through merge_fragments.
                     # This standardizes the container to MPEG-TS for downstream processing.
-                    if self._merge_fragments(info, files_for_seq, merged_ts_path):
-                        with open(merged_ts_path, "rb") as f:
-                            data = f.read()
-
+                    data = self._merge_fragments(info, files_for_seq, fragment_dir)
+                    if data is not None:
                         duration = StreamHelper.get_precise_duration(data)
 
                         if duration > 0:
                             buffer.extend(data)
                             buffer_duration += duration
 
-                        # Cleanup merged file
-                        with contextlib.suppress(OSError):
-                            os.remove(merged_ts_path)
-
                         last_seq = seq
 
                         # Check buffer size and emit. We subtract 200ms since the fragments aren't exact. And we want to process a chunk that is 5.99 seconds since it is close enough to 6.
@@ -609,21 +619,59 @@ class DASHWorker(AbstractWorker):
             current_stream_time += buffer_duration
             self._save_state(state_file, info.stream_id, last_seq, current_stream_time)
 
-    def _merge_fragments(self, info: StreamInfoObject, inputs: list[str], output: str) -> bool:
-        """Merges fragment files into one MPEG-TS file using ffmpeg. Logs stderr on failure."""
+    def _scan_fragments(self, fragment_dir: str, last_seq: int, fragment_seqs: dict[str, int | None]) -> dict[int, list[str]]:
+        """
+        Groups the downloaded fragment files newer than last_seq by sequence number.
+        A sequence with only empty files is still listed, with no paths, since yt-dlp has started on it.
+
+        fragment_seqs caches the sequence parsed from each filename across calls.
+        """
+        pending_fragments: dict[int, list[str]] = {}
+        try:
+            with os.scandir(fragment_dir) as it:
+                for entry in it:
+                    name = entry.name
+                    if name.endswith((".part", ".ytdl")):
+                        continue
+                    if name in fragment_seqs:
+                        seq = fragment_seqs[name]
+                    else:
+                        match = _FRAG_RE.search(name)
+                        seq = fragment_seqs[name] = int(match.group(1)) if match else None
+
+                    # Skip non-fragments and fragments we have already processed
+                    if seq is None or seq <= last_seq:
+                        continue
+
+                    files_for_seq = pending_fragments.setdefault(seq, [])
+                    try:
+                        if not entry.is_file() or entry.stat().st_size == 0:
+                            continue
+                    except OSError:
+                        continue
+                    files_for_seq.append(entry.path)
+        except FileNotFoundError:
+            pass
+        return pending_fragments
+
+    def _merge_fragments(self, info: StreamInfoObject, inputs: list[str], fragment_dir: str) -> bytes | None:
+        """
+        Merges fragment files into one MPEG-TS stream using ffmpeg and returns it. ffmpeg writes to stdout,
+        so nothing is written to disk. Returns None on failure and logs stderr.
+        """
         cmd = ["ffmpeg", "-y"]
         for inp in inputs:
             cmd.extend(["-i", inp])
-        cmd.extend(["-c", "copy", "-f", "mpegts", output])
+        cmd.extend(["-c", "copy", "-f", "mpegts", "pipe:1"])
 
-        log_path = os.path.join(os.path.dirname(os.path.dirname(output)), "ffmpeg_dash.log")
+        log_path = os.path.join(os.path.dirname(fragment_dir), "ffmpeg_dash.log")
 
         try:
-            subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True, timeout=30)
-            return True
+            result = subprocess.run(cmd, capture_output=True, check=True, timeout=30)
+            return result.stdout
         except subprocess.TimeoutExpired:
-            logger.error(f"[{info.key}][DASHWorker] ffmpeg merge timed out for {output}")
-            return False
+            logger.error(f"[{info.key}][DASHWorker] ffmpeg merge timed out for {inputs}")
+            return None
         except subprocess.CalledProcessError as e:
             try:
                 with open(log_path, "a") as lf:
@@ -634,5 +682,5 @@ class DASHWorker(AbstractWorker):
                     lf.write("\n")
             except Exception:
                 pass
-            logger.warning(f"[{info.key}][DASHWorker] ffmpeg merge failed for {output}")
-            return False
+            logger.warning(f"[{info.key}][DASHWorker] ffmpeg merge failed for {inputs}")
+            return None
@@ -1,10 +1,11 @@
+import contextlib
 import logging
 import subprocess
 import time
 
 from live_transcript_worker.custom_types import ProcessObject, StreamInfoObject
 from live_transcript_worker.helper import StreamHelper
-from live_transcript_worker.worker_abstract import AbstractWorker
+from live_transcript_worker.worker_abstract import PIPE_READ_SIZE, AbstractWorker
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +22,7 @@ class MPEGFixedBitrateWorker(AbstractWorker):
 
     def start(self, info: StreamInfoObject):
         logger.info(f"[{info.key}][MPEGFixedBitrateWorker] Starting download")
-        process, sample_rate = self.create_process(info)
+        process, byte_rate = self.create_process(info)
 
         if process is None:
             logger.error(f"[{info.key}][MPEGFixedBitrateWorker] process failed to start.")
@@ -31,20 +32,23 @@ class MPEGFixedBitrateWorker(AbstractWorker):
             logger.error(f"[{info.key}][MPEGFixedBitrateWorker] yt-dlp process failed to start.")
             return
 
-        buffer: bytes = b""
-        chunk_size = self.buffer_size_seconds * sample_rate
+        read_stderr = self.drain_pipe(process.stderr)
+        chunk_size = self.buffer_size_seconds * byte_rate
+        # Reads land directly in a preallocated buffer instead of growing a bytes object per read.
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        fill = 0
         audio_start_time = time.time() - self.live_latency_seconds
-        next_start_time = 0
         while not self.stop_event.is_set():
-            chunk = process.stdout.read(4096)
-            next_start_time = (
-                time.time() - self.live_latency_seconds
-            )  # Once we process the buffer, the current time is when the next buffer starts
-            if not chunk:
-                process.poll()
+            # Never read past the end of the current chunk, so every emitted chunk is exactly chunk_size.
+            read = process.stdout.readinto(view[fill : fill + min(PIPE_READ_SIZE, chunk_size - fill)])
+            if not read:
+                # EOF means yt-dlp closed stdout, so it is exiting; give it a moment rather than a single poll.
+                with contextlib.suppress(subprocess.TimeoutExpired):
+                    process.wait(timeout=5)
                 if process.returncode is not None:
                     logger.info(f"[{info.key}][MPEGFixedBitrateWorker] yt-dlp process ended with code {process.returncode}.")
-                    stderr_output = process.stderr.read().decode(errors="ignore")
+                    stderr_output = read_stderr(5)
                     if stderr_output:
                         logger.debug(f"[{info.key}][MPEGFixedBitrateWorker] yt-dlp stderr:\n{stderr_output}")
                     if process.returncode != 0:
@@ -55,12 +59,15 @@ class MPEGFixedBitrateWorker(AbstractWorker):
                     logger.warning(f"[{info.key}][MPEGFixedBitrateWorker] No data from yt-dlp, potentially stalled...")
                 break
 
-            buffer += chunk
-            if len(buffer) < chunk_size:
+            fill += read
+            if fill < chunk_size:
                 continue
 
+            # The read that completed this chunk just returned, so now is when the next chunk starts.
+            # Only sampled here: the intermediate reads never used it.
+            next_start_time = time.time() - self.live_latency_seconds
             process_obj = ProcessObject(
-                raw=buffer,
+                raw=bytes(view[:fill]),
                 audio_start_time=audio_start_time,
                 key=info.key,
                 media_type=info.media_type,
@@ -69,12 +76,12 @@ class MPEGFixedBitrateWorker(AbstractWorker):
             logger.debug(f"[{info.key}][MPEGFixedBitrateWorker] Adding audio to queue.")
             self.queue.put(process_obj)
             audio_start_time = next_start_time
-            buffer = b""
+            fill = 0
 
-        if len(buffer) >= 4096:
+        if fill >= 4096:
             # Exited but there is still data in the buffer.
             process_obj = ProcessObject(
-                raw=buffer,
+                raw=bytes(view[:fill]),
                 audio_start_time=audio_start_time,
                 key=info.key,
                 media_type=info.media_type,
@@ -87,7 +94,7 @@ class MPEGFixedBitrateWorker(AbstractWorker):
 
     def create_process(self, info: StreamInfoObject) -> tuple[subprocess.Popen[bytes] | None, int]:
         process = None
-        sample_rate = 0
+        byte_rate = 0
         logger.debug(f"[{info.key}][MPEGFixedBitrateWorker][create_process] creating yt-dlp download process")
         try:
             cmd = [
@@ -105,10 +112,11 @@ class MPEGFixedBitrateWorker(AbstractWorker):
                 "-",
                 info.url,
             ]
-            sample_rate = self.twitch_audio_rate if "twitch.tv" in info.url.lower() else self.yt_audio_rate
+            byte_rate = self.twitch_audio_rate if "twitch.tv" in info.url.lower() else self.yt_audio_rate
             process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0)
+            self.enlarge_pipe(process.stdout)
             logger.debug(f"[{info.key}][MPEGFixedBitrateWorker][create_process] successfully created yt-dlp download process.")
-            return process, sample_rate
+            return process, byte_rate
         except FileNotFoundError:
             logger.error(f"[{info.key}][MPEGFixedBitrateWorker][create_process] 'yt-dlp' not found under '{self.ytdlp_path}'.")
-        return process, sample_rate
+        return process, byte_rate
@@ -101,8 +101,9 @@ def main():
 
     try:
         app_logger.info("Application started. Waiting for shutdown signal.")
-        while not shutdown_event.is_set():
-            shutdown_event.wait(timeout=1.0)
+        # Blocks until a signal handler sets the event. On POSIX the untimed wait is
+        # interrupted to run the handler, so no polling timeout is needed.
+        shutdown_event.wait()
     except Exception as e:
         app_logger.error(f"An unexpected error occurred: {e}", exc_info=True)
     finally:
@@ -1,9 +1,10 @@
+import os
 import sys
 
 import pytest
 import yaml
 
-from live_transcript_worker.config import Config
+from live_transcript_worker.config import Config, ConfigSnapshot
 
 
 # Helper to create a temporary config file
@@ -30,7 +31,7 @@ def test_get_config_no_file(mocker):
 def test_get_config_invalid_yaml(mocker):
     # Simulate invalid YAML
     mocker.patch("builtins.open", mocker.mock_open(read_data="{ invalid yaml"))
-    mocker.patch("yaml.safe_load", side_effect=yaml.YAMLError)
+    mocker.patch("yaml.load", side_effect=yaml.YAMLError)
     mocker.patch("sys.exit")
 
     config = Config.get_config()
@@ -74,6 +75,12 @@ def test_get_streamer_config_found(mocker):
     assert conf == {"key": "k1", "val": 1}
 
 
+def test_get_streamer_config_first_match_wins(mocker):
+    mock_data = {"streamers": [{"key": "k1", "url": "first"}, {"key": "k1", "url": "second"}, "invalid"]}
+    mocker.patch.object(Config, "get_config", return_value=mock_data)
+    assert Config.get_streamer_config("k1") == {"key": "k1", "url": "first"}
+
+
 def test_get_streamer_config_not_found(mocker):
     mock_data = {"streamers": [{"key": "k1"}]}
     mocker.patch.object(Config, "get_config", return_value=mock_data)
@@ -89,7 +96,58 @@ def test_get_streamer_config_invalid_list(mocker):
     assert Config.get_streamer_config("k1") == {}
 
 
+def test_get_streamer_keys(mocker):
+    mock_data = {"streamers": [{"key": "k1"}, {"url": "no-key"}, {"key": ""}, "invalid", {"key": "k2"}]}
+    mocker.patch.object(Config, "get_config", return_value=mock_data)
+    assert Config.get_streamer_keys() == ("k1", "k2")
+
+
 def test_get_id_blacklist_config(mocker):
     mock_data = {"id_blacklist": ["id1", "id2"]}
     mocker.patch.object(Config, "get_config", return_value=mock_data)
     assert Config.get_id_blacklist_config() == ["id1", "id2"]
+
+
+def test_get_config_cached_until_file_changes(temp_config_file, mocker):
+    temp_config_file.write_text("server:\n  url: foo\n")
+    # os.path.join drops the config dir prefix for an absolute filename.
+    mocker.patch.object(Config, "config_filename", str(temp_config_file))
+    load_spy = mocker.spy(yaml, "load")
+
+    first = Config.get_config()
+    second = Config.get_config()
+    assert first == {"server": {"url": "foo"}}
+    assert second is first
+    assert load_spy.call_count == 1
+
+    temp_config_file.write_text("server:\n  url: foobar\n")
+    assert Config.get_config() == {"server": {"url": "foobar"}}
+    assert load_spy.call_count == 2
+
+
+def test_get_config_sees_same_size_edit_within_float_mtime_resolution(temp_config_file, mocker):
+    mocker.patch.object(Config, "config_filename", str(temp_config_file))
+    mtime_ns = 1_700_000_000_000_000_000
+    temp_config_file.write_text("server:\n  url: foo\n")
+    os.utime(temp_config_file, ns=(mtime_ns, mtime_ns))
+    assert Config.get_config() == {"server": {"url": "foo"}}
+
+    # Same size, and the mtimes differ by less than a float st_mtime can resolve.
+    temp_config_file.write_text("server:\n  url: bar\n")
+    os.utime(temp_config_file, ns=(mtime_ns + 1, mtime_ns + 1))
+    assert Config.get_config() == {"server": {"url": "bar"}}
+
+
+def test_snapshot_reused_until_config_changes(mocker):
+    mock_data = {"server": {"url": "foo"}, "streamers": [{"key": "k1"}]}
+    mocker.patch.object(Config, "get_config", return_value=mock_data)
+    from_dict_spy = mocker.spy(ConfigSnapshot, "from_dict")
+
+    assert Config.get_server_config() == {"url": "foo"}
+    assert Config.get_all_streamers_config() == [{"key": "k1"}]
+    assert Config.get_streamer_config("k1") == {"key": "k1"}
+    assert from_dict_spy.call_count == 1
+
+    mocker.patch.object(Config, "get_config", return_value={"server": {"url": "bar"}})
+    assert Config.get_server_config() == {"url": "bar"}
+    assert from_dict_spy.call_count == 2
@@ -1,5 +1,9 @@
+import io
+import os
+import subprocess
 from unittest.mock import MagicMock
 
+import av
 import pytest
 
 from live_transcript_worker.custom_types import Media
@@ -24,14 +28,14 @@ def test_remove_date():
 
 
 def test_get_stream_stats_success(mocker):
-    mock_popen = mocker.patch("subprocess.Popen")
-    process_mock = MagicMock()
-    process_mock.communicate.return_value = (
+    mock_run = mocker.patch("subprocess.run")
+    process_mock = subprocess.CompletedProcess(args=[], returncode=0)
+    process_mock.stdout, process_mock.stderr = (
         '{"is_live": true, "id": "123", "title": "Test Title", "release_timestamp": 12345}',
         "",
     )
     process_mock.returncode = 0
-    mock_popen.return_value = process_mock
+    mock_run.return_value = process_mock
 
     info = StreamHelper.get_stream_stats("http://test.com")
 
@@ -42,15 +46,15 @@ def test_get_stream_stats_success(mocker):
 
 
 def test_get_stream_stats_twitch(mocker):
-    mock_popen = mocker.patch("subprocess.Popen")
-    process_mock = MagicMock()
+    mock_run = mocker.patch("subprocess.run")
+    process_mock = subprocess.CompletedProcess(args=[], returncode=0)
     # Twitch uses 'timestamp', 'display_id', 'description'
-    process_mock.communicate.return_value = (
+    process_mock.stdout, process_mock.stderr = (
         '{"is_live": true, "id": "123", "display_id": "User", "description": "Desc", "timestamp": 12345}',
         "",
     )
     process_mock.returncode = 0
-    mock_popen.return_value = process_mock
+    mock_run.return_value = process_mock
 
     info = StreamHelper.get_stream_stats("http://twitch.tv/user")
 
@@ -60,11 +64,11 @@ def test_get_stream_stats_twitch(mocker):
 
 
 def test_get_stream_stats_failure(mocker):
-    mock_popen = mocker.patch("subprocess.Popen")
-    process_mock = MagicMock()
+    mock_run = mocker.patch("subprocess.run")
+    process_mock = subprocess.CompletedProcess(args=[], returncode=0)
     process_mock.returncode = 1
-    process_mock.communicate.return_value = ("", "Error")
-    mock_popen.return_value = process_mock
+    process_mock.stdout, process_mock.stderr = ("", "Error")
+    mock_run.return_value = process_mock
 
     info = StreamHelper.get_stream_stats("http://test.com")
     assert info.is_live is False
@@ -115,15 +119,15 @@ def test_format_duration_truncates_fractional():
 
 
 def test_get_stream_stats_upcoming_via_stderr(mocker):
-    mock_popen = mocker.patch("subprocess.Popen")
+    mock_run = mocker.patch("subprocess.run")
     mock_time = mocker.patch("time.time", return_value=1_000_000.0)
-    process_mock = MagicMock()
+    process_mock = subprocess.CompletedProcess(args=[], returncode=0)
     process_mock.returncode = 1
-    process_mock.communicate.return_value = (
+    process_mock.stdout, process_mock.stderr = (
         "",
         "ERROR: [youtube] DpNxmBaMB8Y: This live event will begin in 5 hours.",
     )
-    mock_popen.return_value = process_mock
+    mock_run.return_value = process_mock
 
     info = StreamHelper.get_stream_stats("https://www.youtube.com/channel/UC.../live")
 
@@ -134,14 +138,14 @@ def test_get_stream_stats_upcoming_via_stderr(mocker):
 
 
 def test_get_stream_stats_confirmed_offline_via_stderr(mocker):
-    mock_popen = mocker.patch("subprocess.Popen")
-    process_mock = MagicMock()
+    mock_run = mocker.patch("subprocess.run")
+    process_mock = subprocess.CompletedProcess(args=[], returncode=0)
     process_mock.returncode = 1
-    process_mock.communicate.return_value = (
+    process_mock.stdout, process_mock.stderr = (
         "",
         "ERROR: [youtube:tab] UC3n5uGu18FoCy23ggWWp8tA: The channel is not currently live",
     )
-    mock_popen.return_value = process_mock
+    mock_run.return_value = process_mock
 
     info = StreamHelper.get_stream_stats("https://www.youtube.com/channel/UC.../live")
 
@@ -152,11 +156,11 @@ def test_get_stream_stats_confirmed_offline_via_stderr(mocker):
 
 def test_get_stream_stats_unknown_error_not_offline(mocker):
     """Other non-zero errors (e.g. member-only, network) should NOT trigger confirmed_offline."""
-    mock_popen = mocker.patch("subprocess.Popen")
-    process_mock = MagicMock()
+    mock_run = mocker.patch("subprocess.run")
+    process_mock = subprocess.CompletedProcess(args=[], returncode=0)
     process_mock.returncode = 1
-    process_mock.communicate.return_value = ("", "ERROR: Some unrelated network failure")
-    mock_popen.return_value = process_mock
+    process_mock.stdout, process_mock.stderr = ("", "ERROR: Some unrelated network failure")
+    mock_run.return_value = process_mock
 
     info = StreamHelper.get_stream_stats("https://www.youtube.com/channel/UC.../live")
 
@@ -172,15 +176,15 @@ def test_get_stream_stats_twitch_offline_uses_default_poll(mocker):
     2. No JSONDecodeError path is hit (empty stdout must not trigger json.loads).
     3. is_live stays False.
     """
-    mock_popen = mocker.patch("subprocess.Popen")
+    mock_run = mocker.patch("subprocess.run")
     mock_logger_error = mocker.patch("live_transcript_worker.helper.logger.error")
-    process_mock = MagicMock()
+    process_mock = subprocess.CompletedProcess(args=[], returncode=0)
     process_mock.returncode = 1
-    process_mock.communicate.return_value = (
+    process_mock.stdout, process_mock.stderr = (
         "",
         "ERROR: [twitch:stream] dokibird: The channel is not currently live\n",
     )
-    mock_popen.return_value = process_mock
+    mock_run.return_value = process_mock
 
     info = StreamHelper.get_stream_stats("https://www.twitch.tv/dokibird")
 
@@ -195,14 +199,14 @@ def test_get_stream_stats_twitch_offline_uses_default_poll(mocker):
 def test_get_stream_stats_twitch_skips_stderr_parsing(mocker):
     """Even if Twitch stderr happens to contain YouTube-style phrases, we must
     leave scheduled_start_time / confirmed_offline at defaults."""
-    mock_popen = mocker.patch("subprocess.Popen")
-    process_mock = MagicMock()
+    mock_run = mocker.patch("subprocess.run")
+    process_mock = subprocess.CompletedProcess(args=[], returncode=0)
     process_mock.returncode = 1
-    process_mock.communicate.return_value = (
+    process_mock.stdout, process_mock.stderr = (
         "",
         "ERROR: This live event will begin in 5 hours. The channel is not currently live",
     )
-    mock_popen.return_value = process_mock
+    mock_run.return_value = process_mock
 
     info = StreamHelper.get_stream_stats("https://www.twitch.tv/somechannel")
 
@@ -212,11 +216,18 @@ def test_get_stream_stats_twitch_skips_stderr_parsing(mocker):
 
 
 def test_get_stream_stats_json_error(mocker):
-    mock_popen = mocker.patch("subprocess.Popen")
-    process_mock = MagicMock()
-    process_mock.communicate.return_value = ("invalid json", "")
+    mock_run = mocker.patch("subprocess.run")
+    process_mock = subprocess.CompletedProcess(args=[], returncode=0)
+    process_mock.stdout, process_mock.stderr = ("invalid json", "")
     process_mock.returncode = 0
-    mock_popen.return_value = process_mock
+    mock_run.return_value = process_mock
+
+    info = StreamHelper.get_stream_stats("http://test.com")
+    assert info.is_live is False
+
+
+def test_get_stream_stats_timeout(mocker):
+    mocker.patch("subprocess.run", side_effect=subprocess.TimeoutExpired(cmd="yt-dlp", timeout=30))
 
     info = StreamHelper.get_stream_stats("http://test.com")
     assert info.is_live is False
@@ -263,6 +274,31 @@ def test_get_duration_valid(mocker):
     assert duration == 10.0
 
 
+def test_get_duration_reuses_file_object(mocker):
+    mock_av = mocker.patch("av.open")
+    mock_container = MagicMock()
+    mock_container.duration = 10_000_000
+    mock_container.start_time = 2_000_000
+    mock_av.return_value.__enter__.return_value = mock_container
+
+    buffer = io.BytesIO(b"fake_audio")
+    buffer.read()
+    assert StreamHelper.get_duration(buffer) == 8.0
+    mock_av.assert_called_once_with(buffer, mode="r", options=mocker.ANY)
+    assert buffer.tell() == 0
+    assert not buffer.closed
+
+
+def test_get_duration_capped_probe_matches_full_probe():
+    with open(os.path.join(os.path.dirname(__file__), "audio", "1-to-10.mp3"), "rb") as f:
+        data = f.read()
+    with av.open(io.BytesIO(data)) as container:
+        full_duration = (container.duration - container.start_time) / 1_000_000.0
+
+    assert StreamHelper.get_duration(data) == pytest.approx(full_duration, abs=0.01)
+    assert StreamHelper.get_duration(data) > 10.0
+
+
 def test_get_duration_error(mocker):
     mocker.patch("av.open", side_effect=Exception("av error"))
     assert StreamHelper.get_duration(b"bad") == 0.0
@@ -278,15 +314,15 @@ def test_get_media_type(mocker):
 
 
 def test_get_stream_stats_none_start_time(mocker):
-    mock_popen = mocker.patch("subprocess.Popen")
-    process_mock = MagicMock()
+    mock_run = mocker.patch("subprocess.run")
+    process_mock = subprocess.CompletedProcess(args=[], returncode=0)
     # release_timestamp is None, timestamp is None
-    process_mock.communicate.return_value = (
+    process_mock.stdout, process_mock.stderr = (
         '{"is_live": true, "id": "123", "title": "Test Title", "release_timestamp": null, "timestamp": null}',
         "",
     )
     process_mock.returncode = 0
-    mock_popen.return_value = process_mock
+    mock_run.return_value = process_mock
 
     info = StreamHelper.get_stream_stats("http://test.com")
 
@@ -294,3 +330,14 @@ def test_get_stream_stats_none_start_time(mocker):
     assert info.start_time != "None"
     # Should be a numeric string (fallback to time.time())
     assert float(info.start_time) > 0
+
+
+def test_get_duration_probes_bytearray_in_place():
+    with open(os.path.join(os.path.dirname(__file__), "audio", "1-to-10.mp3"), "rb") as f:
+        data = f.read()
+    buffer = bytearray(data)
+
+    assert StreamHelper.get_duration(buffer) == pytest.approx(StreamHelper.get_duration(data))
+    assert StreamHelper.get_duration(memoryview(buffer)) == pytest.approx(StreamHelper.get_duration(data))
+    # The probe released its view, so the downloader can keep appending
+    buffer.extend(b"\x00")
@@ -16,7 +16,8 @@ def process_audio_instance(mock_storage_process, mock_config, mocker):
     mocker.patch("live_transcript_worker.process_audio.WhisperModel")
     ready_event = MagicMock()
     pa = ProcessAudio(ready_event)
-    return pa
+    yield pa
+    pa.close()
 
 
 def test_load_model(process_audio_instance):
@@ -33,6 +34,8 @@ def test_decensor(process_audio_instance):
     assert process_audio_instance.decensor("F**k") == "Fuck"
     assert process_audio_instance.decensor("normal text") == "normal text"
     assert process_audio_instance.decensor("a** and b**ch") == "ass and bitch"
+    assert process_audio_instance.decensor("F***ing f*****g ****") == "Fucking fucking fuck"
+    assert process_audio_instance.decensor("what the fuck***t") == "what the fucking bullshit"
 
 
 def test_transcribe_success(process_audio_instance, mocker):
@@ -46,11 +49,12 @@ def test_transcribe_success(process_audio_instance, mocker):
 
     mock_model.transcribe.return_value = ([s1, s2], MagicMock(duration=5.0))
 
-    segments, duration = process_audio_instance.transcribe(b"data")
+    segments, duration = process_audio_instance.transcribe(b"data", 100.5)
 
     assert len(segments) == 2
     assert duration == 5.0
-    assert segments[0] == (0.0, "hello")
+    assert segments[0] == {"timestamp": 100, "text": "hello"}
+    assert segments[1] == {"timestamp": 101, "text": "world"}
 
 
 def test_transcribe_short_duration(process_audio_instance, mocker):
@@ -75,12 +79,14 @@ def test_process_audio_full_flow(process_audio_instance, mock_storage_process, m
     mocker.patch.object(
         process_audio_instance,
         "transcribe",
-        return_value=([(0.0, "hello"), (1.0, "world")], 5.0),
+        return_value=([{"timestamp": 100, "text": "hello"}, {"timestamp": 101, "text": "world"}], 5.0),
     )
 
     item = ProcessObject(raw=b"data", audio_start_time=100.0, key="key", media_type=Media.AUDIO, vod_accurate=False)
 
     process_audio_instance.process_audio(item)
+    process_audio_instance.transcribe.assert_called_once_with(mocker.ANY, 100.0)
+    process_audio_instance.close()
 
     # assert storage add_new_line called
     mock_storage_instance = mock_storage_process.return_value
@@ -100,6 +106,31 @@ def test_process_audio_no_transcription(process_audio_instance, mock_storage_pro
     item = ProcessObject(raw=b"data", audio_start_time=100.0, key="key", media_type=Media.AUDIO, vod_accurate=False)
 
     process_audio_instance.process_audio(item)
+    process_audio_instance.close()
 
     mock_storage_instance = mock_storage_process.return_value
     mock_storage_instance.add_new_line.assert_not_called()
+
+
+def test_storage_writer_keeps_order_and_survives_errors(process_audio_instance, mock_storage_process):
+    mock_storage_instance = mock_storage_process.return_value
+    mock_storage_instance.add_new_line.side_effect = [Exception("disk full"), None, None]
+
+    for i in range(3):
+        process_audio_instance.storage_queue.put(("key", {"timestamp": i}, None))
+    process_audio_instance.close()
+
+    timestamps = [c.args[1]["timestamp"] for c in mock_storage_instance.add_new_line.call_args_list]
+    assert timestamps == [0, 1, 2]
+
+
+@pytest.mark.parametrize(("media_type", "expect_line"), [(Media.NONE, False), (Media.AUDIO, True)])
+def test_process_audio_empty_segments(process_audio_instance, mock_storage_process, mocker, media_type, expect_line):
+    mocker.patch.object(process_audio_instance, "transcribe", return_value=([], 5.0))
+
+    item = ProcessObject(raw=b"data", audio_start_time=100.0, key="key", media_type=media_type, vod_accurate=False)
+
+    process_audio_instance.process_audio(item)
+    process_audio_instance.close()
+
+    assert mock_storage_process.return_value.add_new_line.called is expect_line
@@ -1,9 +1,14 @@
+import builtins
+import marshal
 import os
+import queue
+import threading
+import time
 from unittest.mock import MagicMock
 
 import pytest
 
-from live_transcript_worker.custom_types import Media, MediaUploadObject
+from live_transcript_worker.custom_types import Media, MediaUploadObject, StreamInfoObject
 from live_transcript_worker.storage import Storage
 
 
@@ -25,6 +30,27 @@ def test_singleton(storage):
     assert storage is s2
 
 
+def test_singleton_concurrent_first_call(mock_config, mocker):
+    Storage._instances = {}
+    mocker.patch("live_transcript_worker.storage.Config", mock_config)
+    init = mocker.spy(Storage, "__init__")
+    barrier = threading.Barrier(8)
+    instances = []
+
+    def create():
+        barrier.wait()
+        instances.append(Storage())
+
+    threads = [threading.Thread(target=create) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert init.call_count == 1
+    assert all(instance is instances[0] for instance in instances)
+
+
 def test_create_paths(storage, tmp_path, mocker):
     mocker.patch.object(
         storage,
@@ -46,7 +72,7 @@ def test_create_paths(storage, tmp_path, mocker):
 
 def test_activate_new_stream(storage, mocker):
     mock_dict_to_file = mocker.patch.object(storage, "_dict_to_file")
-    mocker.patch.object(storage, "_get_active_id", return_value="old_id")
+    mock_file_to_dict = mocker.patch.object(storage, "_file_to_dict", return_value={"streamId": "old_id"})
     mock_clear_queue = mocker.patch.object(storage, "_clear_queue_folder")
 
     # mock http request
@@ -60,13 +86,11 @@ def test_activate_new_stream(storage, mocker):
     info.start_time = "100"
     info.media_type = Media.AUDIO
 
-    # mock queue to verify clearing
-    storage._Storage__upload_queue = MagicMock()
-    storage._Storage__upload_queue.empty.side_effect = [
-        False,
-        True,
-    ]  # One item then empty
-    storage._Storage__upload_queue.get_nowait.return_value = "item"
+    # queue to verify clearing; replaced so the background worker doesn't consume it
+    upload_queue = queue.Queue()
+    upload_queue.put("item")
+    upload_queue.put("item")
+    storage._Storage__upload_queue = upload_queue
 
     storage.activate(info)
 
@@ -82,14 +106,21 @@ def test_activate_new_stream(storage, mocker):
         },
     )
     mock_clear_queue.assert_called_with("test_key")
-    storage._Storage__upload_queue.get_nowait.assert_called()
+    mock_file_to_dict.assert_called_once_with("test_key")
+    assert upload_queue.empty()
+    assert upload_queue.unfinished_tasks == 0
     storage.session.post.assert_called()
+    assert storage.session.post.call_args.kwargs["params"] == {
+        "id": "new_id",
+        "title": "Title",
+        "startTime": "100",
+        "mediaType": Media.AUDIO,
+    }
 
 
 def test_activate_same_stream(storage, mocker):
-    mock_dict_to_file = mocker.patch.object(storage, "_dict_to_file")
-    mocker.patch.object(storage, "_get_active_id", return_value="same_id")
-    mocker.patch.object(storage, "_file_to_dict", return_value={"isLive": False})
+    mock_write_header = mocker.patch.object(storage, "_write_header")
+    mock_file_to_dict = mocker.patch.object(storage, "_file_to_dict", return_value={"streamId": "same_id", "isLive": False})
 
     # mock http request
     # mock http request
@@ -105,13 +136,14 @@ def test_activate_same_stream(storage, mocker):
 
     storage.activate(info)
 
-    mock_dict_to_file.assert_called()
-    args, _ = mock_dict_to_file.call_args
+    mock_file_to_dict.assert_called_once_with("test_key")
+    mock_write_header.assert_called()
+    args, _ = mock_write_header.call_args
     assert args[1]["isLive"] is True
 
 
 def test_deactivate(storage, mocker):
-    mock_dict_to_file = mocker.patch.object(storage, "_dict_to_file")
+    mock_write_header = mocker.patch.object(storage, "_write_header")
     mocker.patch.object(storage, "_file_to_dict", return_value={"isLive": True})
 
     storage.session = MagicMock()
@@ -119,8 +151,8 @@ def test_deactivate(storage, mocker):
 
     storage.deactivate("key", "id")
 
-    mock_dict_to_file.assert_called()
-    args, _ = mock_dict_to_file.call_args
+    mock_write_header.assert_called()
+    args, _ = mock_write_header.call_args
     assert args[1]["isLive"] is False
 
 
@@ -130,7 +162,7 @@ def test_add_new_line(storage, mocker, tmp_path):
         "_file_to_dict",
         return_value={"streamId": "a12", "transcript": [{"id": 0}], "startTime": 0},
     )
-    mock_dict_to_file = mocker.patch.object(storage, "_dict_to_file")
+    mock_append_line = mocker.patch.object(storage, "_append_line")
     storage.session = MagicMock()
     storage.session.post.return_value = MagicMock(status_code=200)
 
@@ -146,11 +178,8 @@ def test_add_new_line(storage, mocker, tmp_path):
     raw_bytes = b"base64data"
     storage.add_new_line("key", {"timestamp": 100}, raw_bytes)
 
-    # Verify transcript updated
-    mock_dict_to_file.assert_called()
-    updated_data = mock_dict_to_file.call_args[0][1]
-    assert len(updated_data["transcript"]) == 2
-    assert updated_data["transcript"][-1]["id"] == 1
+    # Verify only the new line is appended
+    mock_append_line.assert_called_once_with("key", {"timestamp": 100, "id": 1})
 
     # Verify file saved
     media_file = queue_folder / "media_stream_id=a12 line_id=1.bin"
@@ -167,7 +196,7 @@ def test_add_new_line_sync_error(storage, mocker, tmp_path):
         "_file_to_dict",
         return_value={"streamId": "345", "transcript": [], "startTime": 0},
     )
-    mocker.patch.object(storage, "_dict_to_file")
+    mocker.patch.object(storage, "_append_line")
     storage.session = MagicMock()
     storage.session.post.return_value = MagicMock(status_code=409)
     mock_sync = mocker.patch.object(storage, "sync_server")
@@ -182,6 +211,151 @@ def test_add_new_line_sync_error(storage, mocker, tmp_path):
     mock_sync.assert_called()
 
 
+@pytest.fixture
+def state_files(storage, mocker, tmp_path):
+    """Points the state files of every key at tmp_path."""
+    mocker.patch.object(storage, "_get_marshal_file", return_value=str(tmp_path / "data.marshal"))
+    mocker.patch.object(storage, "_get_header_file", return_value=str(tmp_path / "header.json"))
+    mocker.patch.object(storage, "_get_log_file", return_value=str(tmp_path / "transcript.jsonl"))
+    yield tmp_path
+    storage.close()
+
+
+def test_append_during_log_rewrite_lands_in_new_log(storage, state_files, mocker):
+    """An append racing _dict_to_file waits for the replace instead of reopening the old, soon unlinked, log."""
+    storage._dict_to_file("key", {"streamId": "old", "transcript": [{"id": 0}]})
+    storage._append_line("key", {"id": 1})  # leaves a handle open on the current log
+    replace_file = Storage._replace_file
+    appender: list[threading.Thread] = []
+
+    def replace_with_racing_append(path, content):
+        if path.endswith("transcript.jsonl"):
+            appender.append(threading.Thread(target=storage._append_line, args=("key", {"id": 9})))
+            appender[0].start()
+            appender[0].join(timeout=0.2)
+            assert appender[0].is_alive()  # blocked on the log lock
+        replace_file(path, content)
+
+    mocker.patch.object(storage, "_replace_file", side_effect=replace_with_racing_append)
+    storage._dict_to_file("key", {"streamId": "new", "transcript": []})
+    appender[0].join()
+
+    assert (state_files / "transcript.jsonl").read_text().splitlines() == ['{"id":9}']
+
+
+def test_state_round_trip_appends_lines(storage, state_files):
+    storage._dict_to_file("key", {"streamId": "abc", "isLive": True, "transcript": [{"id": 0}]})
+    storage._append_line("key", {"id": 1, "segments": [{"timestamp": 1, "text": "hi"}]})
+    storage._append_line("key", {"id": 2})
+    storage._write_header("key", {"streamId": "abc", "isLive": False, "transcript": "ignored"})
+
+    assert (state_files / "transcript.jsonl").read_text().splitlines()[1] == '{"id":1,"segments":[{"timestamp":1,"text":"hi"}]}'
+
+    storage._state.clear()  # read back from disk
+    data = storage._file_to_dict("key")
+    assert data == {
+        "streamId": "abc",
+        "isLive": False,
+        "transcript": [{"id": 0}, {"id": 1, "segments": [{"timestamp": 1, "text": "hi"}]}, {"id": 2}],
+    }
+
+
+def test_write_header_failure_keeps_previous_file(storage, state_files, mocker):
+    storage._write_header("key", {"streamId": "abc", "isLive": True})
+    mocker.patch("live_transcript_worker.storage.os.replace", side_effect=OSError("disk full"))
+
+    storage._write_header("key", {"streamId": "abc", "isLive": False})
+
+    assert (state_files / "header.json").read_text() == '{"streamId":"abc","isLive":true}'
+    assert not (state_files / "header.json.tmp").exists()
+
+
+def test_state_drops_partial_trailing_record(storage, state_files):
+    storage._dict_to_file("key", {"streamId": "abc", "transcript": [{"id": 0}]})
+    log_path = state_files / "transcript.jsonl"
+    good_size = log_path.stat().st_size
+    with open(log_path, "ab") as f:
+        f.write(b'{"id": 1, "segm')
+
+    storage._state.clear()
+    assert storage._file_to_dict("key")["transcript"] == [{"id": 0}]
+    assert log_path.stat().st_size == good_size
+
+    storage._append_line("key", {"id": 1})
+    storage._state.clear()
+    assert storage._file_to_dict("key")["transcript"] == [{"id": 0}, {"id": 1}]
+
+
+def test_state_migrates_legacy_marshal(storage, state_files):
+    legacy = {"streamId": "old", "isLive": True, "transcript": [{"id": 0}, {"id": 1}]}
+    with open(state_files / "data.marshal", "wb") as f:
+        marshal.dump(legacy, f)
+
+    assert storage._file_to_dict("key") == legacy
+    assert not (state_files / "data.marshal").exists()
+    storage._state.clear()
+    assert storage._file_to_dict("key") == legacy
+
+
+def test_state_loaded_from_disk_once(storage, state_files, mocker):
+    storage._dict_to_file("key", {"streamId": "abc", "transcript": []})
+    storage._state.clear()
+    read_log = mocker.spy(storage, "_read_log")
+
+    first = storage._file_to_dict("key")
+    first["transcript"].append({"id": 0})
+    assert storage._file_to_dict("key") is first
+    assert read_log.call_count == 1
+
+
+def test_clear_queue_folder_moves_old_files_aside(storage, mocker, tmp_path):
+    queue_folder = tmp_path / "key" / "queue"
+    queue_folder.mkdir(parents=True)
+    (queue_folder / "media_stream_id=a line_id=0.bin").write_bytes(b"data")
+    (tmp_path / "key" / "queue.old-1").mkdir()  # left behind by an earlier run
+    mocker.patch.object(storage, "_get_queue_folder", return_value=str(queue_folder))
+    mock_thread = mocker.patch("live_transcript_worker.storage.threading.Thread")
+
+    storage._clear_queue_folder("key")
+
+    assert queue_folder.is_dir()
+    assert list(queue_folder.iterdir()) == []
+    assert len(list((tmp_path / "key").glob("queue.old-*"))) == 2
+    mock_thread.assert_called_once_with(target=storage._delete_old_queue_folders, args=("key",), daemon=True)
+
+    storage._delete_old_queue_folders("key")
+    assert sorted(p.name for p in (tmp_path / "key").iterdir()) == ["queue"]
+
+
+def test_clear_queue_folder_unlinks_in_place_when_rename_fails(storage, mocker, tmp_path):
+    queue_folder = tmp_path / "queue"
+    queue_folder.mkdir()
+    (queue_folder / "media_stream_id=a line_id=0.bin").write_bytes(b"data")
+    mocker.patch.object(storage, "_get_queue_folder", return_value=str(queue_folder))
+    mocker.patch("live_transcript_worker.storage.threading.Thread")
+    mocker.patch("live_transcript_worker.storage.os.rename", side_effect=OSError("busy"))
+
+    storage._clear_queue_folder("key")
+
+    assert queue_folder.is_dir()
+    assert list(queue_folder.iterdir()) == []
+
+
+def test_media_upload_worker_skips_missing_file(storage, tmp_path):
+    storage._Storage__upload_queue = MagicMock()
+    storage._Storage__upload_queue.get.side_effect = [
+        MediaUploadObject("key", "123", 2, str(tmp_path / "gone.bin")),
+        Exception("Stop Loop"),
+    ]
+    storage.session = MagicMock()
+
+    with pytest.raises(Exception, match="Stop Loop"):
+        storage._media_upload_worker()
+
+    storage.session.post.assert_not_called()
+    storage._Storage__upload_queue.task_done.assert_called_once()
+
+
 def test_media_upload_worker(storage, mocker, tmp_path):
     # Create a real file
     file_path = tmp_path / "media_stream_id=123 line_id=2.bin"
@@ -504,3 +678,174 @@ def test_poll_events_disabled(storage):
     storage.longpoll_session.get.side_effect = AssertionError("should not be called")
 
     assert storage.poll_events(["doki"], 0, 25) is None
+
+
+def test_local_transcript_file_kept_open_until_deactivate(storage, state_files, mocker):
+    storage._Storage__enable_request = False
+    transcript_path = state_files / "transcript.text"
+    mocker.patch.object(storage, "_get_transcript_file", return_value=str(transcript_path))
+    mocker.patch.object(storage, "_clear_queue_folder")
+    opener = mocker.spy(builtins, "open")
+
+    info = StreamInfoObject(key="key", stream_id="abc", stream_title="Title", start_time="100", media_type=Media.NONE)
+    storage.activate(info)
+    storage.add_new_line("key", {"timestamp": 105, "segments": [{"text": "hello"}]}, None)
+    storage.add_new_line("key", {"timestamp": 3700, "segments": [{"text": "world"}]}, None)
+
+    transcript_opens = [c for c in opener.call_args_list if c.args and c.args[0] == str(transcript_path)]
+    assert len(transcript_opens) == 1
+    assert transcript_path.read_text().splitlines()[1:] == ["[00:00:05] hello", "[01:00:00] world"]
+
+    storage.deactivate("key", "abc")
+    assert storage._Storage__transcript_files == {}
+
+    # A line that arrives after deactivate reopens the file instead of writing to the closed handle.
+    storage.add_new_line("key", {"timestamp": 3710, "segments": [{"text": "late"}]}, None)
+    assert transcript_path.read_text().splitlines()[-1] == "[01:00:10] late"
+    storage.close()
+
+
+def test_activate_and_add_new_line_concurrently(storage, state_files, mocker):
+    """ProcessAudio's storage writer adds lines while the watcher thread activates the same key."""
+    storage._Storage__enable_request = False
+    mocker.patch.object(storage, "_get_transcript_file", return_value=str(state_files / "transcript.text"))
+    mocker.patch.object(storage, "_clear_queue_folder")
+    storage.activate(StreamInfoObject(key="key", stream_id="first", stream_title="Title", start_time="100", media_type=Media.NONE))
+    replace_file = Storage._replace_file
+
+    def slow_replace(path, content):
+        time.sleep(0.002)  # widen the window between activate closing the log and replacing it
+        replace_file(path, content)
+
+    mocker.patch.object(storage, "_replace_file", side_effect=slow_replace)
+    errors: list[Exception] = []
+
+    def run(target):
+        try:
+            target()
+        except Exception as e:
+            errors.append(e)
+
+    activating = threading.Event()
+    activating.set()
+
+    def add_lines():
+        i = 0
+        while activating.is_set():
+            storage.add_new_line("key", {"timestamp": 100 + i, "segments": [{"text": f"line {i}"}]}, None)
+            i += 1
+
+    def activate_streams():
+        for i in range(20):
+            storage.activate(StreamInfoObject(key="key", stream_id=f"s{i}", stream_title="Title", start_time="100", media_type=Media.NONE))
+        activating.clear()
+
+    threads = [threading.Thread(target=run, args=(add_lines,)), threading.Thread(target=run, args=(activate_streams,))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    storage.add_new_line("key", {"timestamp": 999, "segments": [{"text": "final"}]}, None)
+
+    assert errors == []
+    storage._state.clear()  # read back from disk
+    assert storage._file_to_dict("key")["transcript"][-1]["segments"] == [{"text": "final"}]
+
+
+def test_get_start_seconds_parsed_once(storage):
+    data = {"startTime": "1700000000.75"}
+    assert storage._get_start_seconds("key", data) == 1700000000
+
+    data["startTime"] = "5"
+    assert storage._get_start_seconds("key", data) == 1700000000
+    assert storage._get_start_seconds("other", {"startTime": "None"}) == 0
+
+
+def test_retry_delay_honors_retry_after(storage, mocker):
+    assert storage._retry_delay(1, MagicMock(headers={"Retry-After": "7"})) == 7.0
+    assert storage._retry_delay(1, MagicMock(headers={"Retry-After": "3600"})) == 60.0
+    assert storage._retry_delay(1, MagicMock(headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+
+    # Missing or unparsable header falls back to jittered exponential backoff
+    for headers in ({}, {"Retry-After": "soon"}):
+        assert 4.0 <= storage._retry_delay(2, MagicMock(headers=headers)) < 5.0
+    assert 2.0 <= storage._retry_delay(1) < 3.0
+
+
+def test_post_with_retry_waits_retry_after(storage, mocker):
+    mock_sleep = mocker.patch("live_transcript_worker.storage.time.sleep")
+    storage.session = MagicMock()
+    storage.session.post.side_effect = [
+        MagicMock(status_code=503, headers={"Retry-After": "5"}),
+        MagicMock(status_code=200, headers={}),
+    ]
+
+    response = storage._post_with_retry("http://localhost/x")
+
+    assert response.status_code == 200
+    mock_sleep.assert_called_once_with(5.0)
+
+
+def test_drain_upload_queue_keeps_in_flight_task(storage):
+    upload_queue = queue.Queue()
+    storage._Storage__upload_queue = upload_queue
+    for i in range(3):
+        upload_queue.put(i)
+    upload_queue.get()  # taken by the worker, not yet done
+
+    storage._drain_upload_queue()
+
+    assert upload_queue.empty()
+    assert upload_queue.unfinished_tasks == 1
+    upload_queue.task_done()
+    upload_queue.join()
+
+
+def test_wait_for_uploads_returns_immediately_when_idle(storage, mocker):
+    mock_sleep = mocker.patch("live_transcript_worker.storage.time.sleep")
+
+    storage.wait_for_uploads(timeout=1)
+
+    mock_sleep.assert_not_called()
+
+
+def test_enqueue_media_tracks_pending_writes(storage, tmp_path, mocker):
+    mocker.patch.object(storage, "_get_queue_folder", return_value=str(tmp_path))
+    storage._Storage__upload_queue = queue.Queue()
+    pending_during_write = []
+    real_replace = os.replace
+
+    def replace(src, dst):
+        pending_during_write.append(storage._Storage__pending_enqueues)
+        real_replace(src, dst)
+
+    mocker.patch("live_transcript_worker.storage.os.replace", side_effect=replace)
+
+    storage._enqueue_media("key", "sid", 1, b"data")
+
+    assert pending_during_write == [1]
+    assert storage._Storage__pending_enqueues == 0
+    assert storage._Storage__upload_queue.qsize() == 1
+
+
+def test_wait_for_uploads_waits_for_in_flight_upload(storage):
+    upload_queue = queue.Queue()
+    storage._Storage__upload_queue = upload_queue
+    upload_queue.put("item")
+    upload_queue.get()  # queue is empty, but the upload is still running
+
+    threading.Timer(0.1, upload_queue.task_done).start()
+    storage.wait_for_uploads(timeout=5)
+
+    assert upload_queue.unfinished_tasks == 0
+
+
+def test_wait_for_uploads_times_out(storage, mocker):
+    upload_queue = queue.Queue()
+    storage._Storage__upload_queue = upload_queue
+    upload_queue.put("item")
+    mock_logger = mocker.patch("live_transcript_worker.storage.logger")
+
+    storage.wait_for_uploads(timeout=0.05)
+
+    mock_logger.warning.assert_called_once_with("[storage] Timeout waiting for uploads to finish.")
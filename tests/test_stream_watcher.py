@@ -56,6 +56,7 @@ def test_start_stop(stream_watcher, mocker):
 
     stream_watcher.stop()
     assert stream_watcher.stop_event.is_set()
+    stream_watcher.storage.close.assert_called_once()
 
 
 def test_watcher_loop(stream_watcher, mocker):
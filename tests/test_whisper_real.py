@@ -68,8 +68,10 @@ def test_real_whisper_transcription(mocker, audio_filename, min_chars, max_chars
     )
 
     # 6. Run process_audio
-    # This calls transcribe, then storage.update
+    # This calls transcribe, then hands the line to the storage thread.
+    # close() waits for that thread to pass it to storage.add_new_line
     pa.process_audio(item)
+    pa.close()
 
     # 7. Verify Results
     # Check that storage.add_new_line was called with valid data
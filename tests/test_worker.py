@@ -107,3 +107,14 @@ def test_gap_too_large_uses_live_segment_and_persists_id(worker, mocker):
     # Deliberate downgrade is persisted so a restart short-circuits to live-edge.
     worker._write_lfs_stream_id.assert_called_once_with("123")
     worker.twitch_lfs_worker.start.assert_not_called()
+
+
+def test_concrete_workers_built_lazily(mocker):
+    mock_dash = mocker.patch("live_transcript_worker.worker.DASHWorker")
+    mock_live_segment = mocker.patch("live_transcript_worker.worker.LiveSegmentWorker")
+    w = Worker("key", MagicMock(), MagicMock())
+
+    mock_dash.assert_not_called()
+    assert w.dash_worker is w.dash_worker
+    mock_dash.assert_called_once_with("key", w.queue, w.stop_event)
+    mock_live_segment.assert_not_called()
@@ -1,3 +1,4 @@
+import os
 from threading import Event
 from unittest.mock import MagicMock
 
@@ -32,3 +33,34 @@ def test_ytdlp_path_resolution(abstract_worker, mocker):
 def test_rates_initialized(abstract_worker):
     assert abstract_worker.yt_audio_rate == 20_000
     assert abstract_worker.twitch_audio_rate == 25_540
+
+
+def test_enlarge_pipe(abstract_worker):
+    fcntl = pytest.importorskip("fcntl")
+    if not hasattr(fcntl, "F_GETPIPE_SZ"):
+        pytest.skip("pipe resizing not supported on this platform")
+    read_fd, write_fd = os.pipe()
+    try:
+        with os.fdopen(read_fd, "rb", buffering=0) as pipe:
+            abstract_worker.enlarge_pipe(pipe)
+            assert fcntl.fcntl(pipe.fileno(), fcntl.F_GETPIPE_SZ) > 65536
+    finally:
+        os.close(write_fd)
+
+
+def test_enlarge_pipe_ignores_missing_pipe(abstract_worker):
+    abstract_worker.enlarge_pipe(None)
+
+
+def test_drain_pipe_reads_to_eof(abstract_worker):
+    read_fd, write_fd = os.pipe()
+    with os.fdopen(read_fd, "rb", buffering=0) as pipe:
+        collect = abstract_worker.drain_pipe(pipe)
+        # More than a pipe buffer's worth, which would block a writer nobody reads from
+        os.write(write_fd, b"x" * 70000)
+        os.write(write_fd, b"ERROR: done")
+        os.close(write_fd)
+
+        output = collect(5)
+
+    assert output.endswith("ERROR: done")
@@ -1,3 +1,4 @@
+import io
 import subprocess
 from unittest.mock import MagicMock
 
@@ -52,7 +53,7 @@ def test_start(buffered_worker, mocker):
 
 def test_downloader_success(buffered_worker, mocker):
     process = MagicMock()
-    process.stdout.read.side_effect = [b"data", b""]  # data then EOF
+    process.stdout.readinto.side_effect = io.BytesIO(b"data").readinto  # data then EOF
     process.stderr.read.return_value = b""
     process.returncode = 0
     process.poll.return_value = 0
@@ -62,12 +63,38 @@ def test_downloader_success(buffered_worker, mocker):
     info = StreamInfoObject(url="url", key="key")
     buffered_worker.stop_event.is_set.return_value = False
     buffered_worker.buffer_lock = MagicMock()
+    buffered_worker.data_available = MagicMock()
+    buffered_worker.wake_size = 4
     buffered_worker.buffer = bytearray()
     buffered_worker.ytdlp_stopped = MagicMock()
 
     buffered_worker.downloader(info)
 
     assert len(buffered_worker.buffer) == 4  # b"data"
+    buffered_worker.data_available.notify.assert_called_once()
+    buffered_worker.ytdlp_stopped.set.assert_called_once()
+    buffered_worker.data_available.notify_all.assert_called_once()  # wakes the reader on exit
+    assert len(process.stdout.readinto.call_args.args[0]) == 65536
+
+
+def test_start_waits_for_estimated_window(buffered_worker, mocker):
+    """A short buffer sets wake_size to the bytes a full window should take, then waits to be notified."""
+    mocker.patch.object(buffered_worker, "downloader")
+    mocker.patch("live_transcript_worker.worker_buffered.StreamHelper.get_duration", return_value=2.0)
+    mock_condition = MagicMock()
+    mocker.patch("live_transcript_worker.worker_buffered.Condition", return_value=mock_condition)
+
+    def fill_buffer(*args, **kwargs):
+        buffered_worker.buffer.extend(b"\x00" * 10000)
+
+    mocker.patch("live_transcript_worker.worker_buffered.Lock", return_value=MagicMock(__enter__=MagicMock(side_effect=fill_buffer)))
+    buffered_worker.stop_event.is_set.side_effect = [False, True, True]
+
+    buffered_worker.start(StreamInfoObject(url="url", key="key", media_type=Media.AUDIO))
+
+    assert buffered_worker.wake_size == 30000  # 10000 bytes hold 2s, so 6s needs 30000
+    mock_condition.wait.assert_called_once_with(timeout=1)
+    buffered_worker.queue.put.assert_called_once()  # only the final flush on stop
 
 
 def test_create_process(buffered_worker, mocker):
@@ -77,3 +104,44 @@ def test_create_process(buffered_worker, mocker):
 
     buffered_worker.create_process(info)
     subprocess.Popen.assert_called_once()
+
+
+def test_start_predicts_next_window_from_last_bitrate(buffered_worker, mocker):
+    """After a window is queued, the empty buffer waits for the byte count the last probe implies, not just min_buffer_size."""
+    mocker.patch.object(buffered_worker, "downloader")
+    mocker.patch("live_transcript_worker.worker_buffered.StreamHelper.get_duration", return_value=6.0)
+    mock_condition = MagicMock()
+    mocker.patch("live_transcript_worker.worker_buffered.Condition", return_value=mock_condition)
+    fills = iter([b"\x00" * 60000, b"", b""])
+
+    def fill_buffer(*args, **kwargs):
+        buffered_worker.buffer.extend(next(fills))
+
+    mocker.patch("live_transcript_worker.worker_buffered.Lock", return_value=MagicMock(__enter__=MagicMock(side_effect=fill_buffer)))
+    buffered_worker.stop_event.is_set.side_effect = [False, False, True, True]
+
+    buffered_worker.start(StreamInfoObject(url="url", key="key", media_type=Media.AUDIO))
+
+    buffered_worker.queue.put.assert_called_once()
+    assert buffered_worker.wake_size == 60000  # 10000 bytes/s over a 6s window
+
+
+def test_start_hands_buffer_to_queue(buffered_worker, mocker):
+    """A full window is queued as the buffer itself and the worker carries on with a fresh one."""
+    mocker.patch.object(buffered_worker, "downloader")
+    mocker.patch("live_transcript_worker.worker_buffered.StreamHelper.get_duration", return_value=10.0)
+    fills = iter([b"\x00" * 200000, b""])
+
+    def fill_buffer(*args, **kwargs):
+        buffered_worker.buffer.extend(next(fills))
+
+    mocker.patch("live_transcript_worker.worker_buffered.Lock", return_value=MagicMock(__enter__=MagicMock(side_effect=fill_buffer)))
+    buffered_worker.stop_event.is_set.side_effect = [False, True]
+
+    buffered_worker.start(StreamInfoObject(url="url", key="key", media_type=Media.AUDIO))
+
+    queued = buffered_worker.queue.put.call_args.args[0].raw
+    assert isinstance(queued, bytearray)
+    assert len(queued) == 200000
+    assert queued is not buffered_worker.buffer
+    assert len(buffered_worker.buffer) == 0
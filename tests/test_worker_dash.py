@@ -0,0 +1,137 @@
+import subprocess
+from threading import Event
+from unittest.mock import MagicMock
+
+import pytest
+
+from live_transcript_worker.custom_types import StreamInfoObject
+from live_transcript_worker.stream_watcher import _CompositeStopEvent
+from live_transcript_worker.worker_dash import DASHWorker
+
+
+@pytest.fixture
+def dash_worker(mocker):
+    mocker.patch("live_transcript_worker.worker_abstract.Config")
+    mocker.patch("live_transcript_worker.helper.Config")
+    queue = MagicMock()
+    stop_event = MagicMock()
+    return DASHWorker("key", queue, stop_event)
+
+
+def test_scan_fragments(dash_worker, tmp_path):
+    (tmp_path / "id.f140.Frag1").write_bytes(b"a")
+    (tmp_path / "id.f140.Frag2").write_bytes(b"a")
+    (tmp_path / "id.f299.Frag2").write_bytes(b"v")
+    (tmp_path / "id.f140.Frag3").write_bytes(b"")  # started but still empty
+    (tmp_path / "id.f299.Frag3.part").write_bytes(b"v")
+    (tmp_path / "merged_1.ts").write_bytes(b"m")
+    fragment_seqs: dict = {}
+
+    pending = dash_worker._scan_fragments(str(tmp_path), 1, fragment_seqs)
+
+    assert sorted(pending) == [2, 3]
+    assert sorted(pending[2]) == [str(tmp_path / "id.f140.Frag2"), str(tmp_path / "id.f299.Frag2")]
+    assert pending[3] == []
+    assert fragment_seqs["id.f140.Frag1"] == 1
+    assert fragment_seqs["merged_1.ts"] is None
+    assert "id.f299.Frag3.part" not in fragment_seqs
+
+
+def test_scan_fragments_missing_dir(dash_worker, tmp_path):
+    assert dash_worker._scan_fragments(str(tmp_path / "missing"), 0, {}) == {}
+
+
+def test_is_complete_av_format_probes_once_per_format(dash_worker, mocker):
+    probe = mocker.patch.object(dash_worker, "_is_complete_av", return_value=True)
+    formats: set = set()
+
+    assert dash_worker._is_complete_av_format("/frags/id.95.Frag1", formats)
+    assert dash_worker._is_complete_av_format("/frags/id.95.Frag2", formats)
+
+    probe.assert_called_once_with("/frags/id.95.Frag1")
+    assert formats == {"id.95."}
+
+
+def test_is_complete_av_format_does_not_cache_failures(dash_worker, mocker):
+    probe = mocker.patch.object(dash_worker, "_is_complete_av", return_value=False)
+    formats: set = set()
+
+    assert not dash_worker._is_complete_av_format("/frags/id.f299.Frag1", formats)
+    assert not dash_worker._is_complete_av_format("/frags/id.f299.Frag2", formats)
+
+    assert probe.call_count == 2
+    assert formats == set()
+
+
+def test_merge_fragments_returns_stdout(dash_worker, mocker):
+    run = mocker.patch("live_transcript_worker.worker_dash.subprocess.run", return_value=MagicMock(stdout=b"ts-data"))
+    info = StreamInfoObject(url="url", key="key")
+
+    data = dash_worker._merge_fragments(info, ["/tmp/key/fragments/id.f140.Frag1"], "/tmp/key/fragments")
+
+    assert data == b"ts-data"
+    assert run.call_args.args[0][-1] == "pipe:1"
+
+
+def test_merge_fragments_failure(dash_worker, mocker, tmp_path):
+    fragment_dir = tmp_path / "fragments"
+    mocker.patch(
+        "live_transcript_worker.worker_dash.subprocess.run",
+        side_effect=subprocess.CalledProcessError(1, "ffmpeg", stderr=b"bad input"),
+    )
+    info = StreamInfoObject(url="url", key="key")
+
+    assert dash_worker._merge_fragments(info, [str(fragment_dir / "id.f140.Frag1")], str(fragment_dir)) is None
+    assert "bad input" in (tmp_path / "ffmpeg_dash.log").read_text()
+
+
+def test_cleanup_removes_fragment_dir(dash_worker, tmp_path):
+    fragment_dir = tmp_path / "fragments"
+    fragment_dir.mkdir()
+    (fragment_dir / "id.f140.Frag1").write_bytes(b"a")
+    (fragment_dir / "id.f140.Frag2.part").write_bytes(b"a")
+
+    dash_worker._cleanup(StreamInfoObject(url="url", key="key", stream_id="id"), str(fragment_dir))
+
+    assert not fragment_dir.exists()
+
+
+def test_create_process_deletes_final_file_only(dash_worker, mocker, tmp_path):
+    mocker.patch("live_transcript_worker.worker_dash.subprocess.Popen")
+    mocker.patch("live_transcript_worker.worker_dash.StreamHelper.ytdlp_auth_args", return_value=[])
+    fragment_dir = tmp_path / "fragments"
+    fragment_dir.mkdir()
+    (fragment_dir / "id.f140").write_bytes(b"final")
+    (fragment_dir / "id.f140.Frag1").write_bytes(b"a")
+    (fragment_dir / "other.f140").write_bytes(b"b")
+
+    dash_worker.create_process(StreamInfoObject(url="url", key="key", stream_id="id"), str(fragment_dir))
+
+    assert sorted(p.name for p in fragment_dir.iterdir()) == ["id.f140.Frag1", "other.f140"]
+
+
+def test_save_state_round_trip_and_skips_unchanged(dash_worker, mocker, tmp_path):
+    state_file = str(tmp_path / "dash_state.json")
+
+    dash_worker._save_state(state_file, "id", 5, 100.0)
+    assert dash_worker._load_state(state_file, "id", 0.0) == (5, 100.0)
+    assert list(tmp_path.iterdir()) == [tmp_path / "dash_state.json"]  # no temp file left behind
+
+    mkstemp = mocker.patch("live_transcript_worker.worker_dash.tempfile.mkstemp")
+    dash_worker._save_state(state_file, "id", 5, 100.0)
+    mkstemp.assert_not_called()
+
+
+def test_monitor_loop_idles_with_composite_stop_event(mocker, tmp_path):
+    """StreamWatcher hands workers a _CompositeStopEvent, which only implements is_set()."""
+    mocker.patch("live_transcript_worker.worker_abstract.Config")
+    mocker.patch("live_transcript_worker.helper.Config")
+    sleep = mocker.patch("live_transcript_worker.worker_dash.time.sleep")
+    worker = DASHWorker("key", MagicMock(), _CompositeStopEvent(Event(), Event()))
+    worker.stale_ytdlp_seconds = 600
+    process = MagicMock(returncode=0)
+    process.poll.side_effect = [None, 0]
+
+    worker._monitor_loop(StreamInfoObject(url="url", key="key"), str(tmp_path), str(tmp_path / "state.json"), process, 0, 0.0)
+
+    sleep.assert_called_once_with(1)
@@ -1,3 +1,4 @@
+import io
 from unittest.mock import MagicMock
 
 import pytest
@@ -19,18 +20,45 @@ def fixed_worker(mocker):
 
 def test_start(fixed_worker, mocker):
     process = MagicMock()
-    process.stdout.read.side_effect = [b"a" * 100000, b""]
+    process.stdout.readinto.side_effect = io.BytesIO(b"a" * 100000).readinto
     process.poll.return_value = 0
     process.returncode = 0
     process.stderr.read.return_value = b""
 
     mocker.patch.object(fixed_worker, "create_process", return_value=(process, 48000))
-    fixed_worker.stop_event.is_set.side_effect = [False, True]
+    fixed_worker.stop_event.is_set.return_value = False
 
     info = StreamInfoObject(url="url", key="key", media_type=Media.AUDIO)
     fixed_worker.start(info)
 
-    assert fixed_worker.queue.put.called
+    # Stream ended before a full chunk, so the remainder is flushed as one final item
+    fixed_worker.queue.put.assert_called_once()
+    assert fixed_worker.queue.put.call_args.args[0].raw == b"a" * 100000
+
+
+def test_start_emits_full_chunks(fixed_worker, mocker):
+    fixed_worker.buffer_size_seconds = 1
+    process = MagicMock()
+    process.stdout.readinto.side_effect = io.BytesIO(bytes(range(256)) * 100).readinto  # 25600 bytes
+    process.poll.return_value = 0
+    process.returncode = 0
+    process.stderr.read.return_value = b""
+
+    mocker.patch.object(fixed_worker, "create_process", return_value=(process, 10000))
+    fixed_worker.stop_event.is_set.return_value = False
+
+    mock_time = mocker.patch("live_transcript_worker.worker_fixedbitrate.time.time", side_effect=[100.0, 106.0, 112.0])
+    fixed_worker.live_latency_seconds = 1
+
+    fixed_worker.start(StreamInfoObject(url="url", key="key", media_type=Media.AUDIO))
+
+    # Clock read once at start and once per full chunk, not per pipe read
+    assert mock_time.call_count == 3
+    starts = [call.args[0].audio_start_time for call in fixed_worker.queue.put.call_args_list]
+    assert starts == [99.0, 105.0, 111.0]
+    chunks = [call.args[0].raw for call in fixed_worker.queue.put.call_args_list]
+    assert [len(c) for c in chunks] == [10000, 10000, 5600]  # full chunks, then the remainder on EOF
+    assert b"".join(chunks) == bytes(range(256)) * 100
 
 
 def test_create_process(fixed_worker, mocker):